@@ -0,0 +1,169 @@
+import contextlib
+import contextvars
+import logging
+import time
+#Django modules
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+from django.shortcuts import render
+from esports.views.roles import is_site_manager, is_state_office
+
+logger = logging.getLogger('esports.performance')
+
+# Queries attached to a slow request log entry
+WORST_QUERY_COUNT = 5
+
+# Counters kept for every tenant and view, times are stored in microseconds
+METRIC_NAMES = [
+    'requests',
+    'request_us',
+    'sql_queries',
+    'sql_us',
+    'template_us',
+    'cache_hits',
+    'cache_misses',
+    'external_calls',
+    'external_us',
+]
+
+# Metrics for the request being handled (None outside a request)
+_current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+# Measurements collected while handling one request
+class RequestMetrics:
+    def __init__(self):
+        self.counts = dict.fromkeys(METRIC_NAMES, 0)
+        self.queries = []
+
+    # Keep only the slowest queries for the slow request log
+    def add_query(self, sql, duration):
+        self.counts['sql_queries'] += 1
+        self.counts['sql_us'] += int(duration * 1000000)
+        self.queries.append((duration, sql))
+        self.queries.sort(key=lambda query: query[0], reverse=True)
+        del self.queries[WORST_QUERY_COUNT:]
+
+
+# Time every SQL statement run on the connection
+def query_timer(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.add_query(sql, time.perf_counter() - started)
+
+
+# Time a block of work, kind is 'template' or 'external'
+@contextlib.contextmanager
+def track_time(kind):
+    metrics = _current_metrics.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.counts[kind + '_us'] += int((time.perf_counter() - started) * 1000000)
+            if kind == 'external':
+                metrics.counts['external_calls'] += 1
+
+
+# Count a league cache lookup
+def record_cache(hit):
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.counts['cache_hits' if hit else 'cache_misses'] += 1
+
+
+# Render a template while timing how long it takes
+def timed_render(request, template_name, context=None):
+    with track_time('template'):
+        return render(request, template_name, context)
+
+
+# Add one request's measurements to the shared per-tenant, per-view totals, one incr per non-zero counter
+def store_metrics(schema, view_name, metrics):
+    prefix = 'metrics:' + schema + ':' + view_name + ':'
+    for name, value in metrics.counts.items():
+        if not value:
+            continue
+        try:
+            cache.incr(prefix + name, value)
+        except ValueError:
+            # First value for this counter, add() decides between workers racing to create it
+            if cache.add(prefix + name, value, None):
+                if name == 'requests':
+                    register_metrics_key(schema + ':' + view_name)
+            else:
+                cache.incr(prefix + name, value)
+
+
+# Record a new tenant and view in the metrics index, each in its own numbered slot so concurrent writers can't drop one
+def register_metrics_key(key):
+    cache.add('metrics:index:count', 0, None)
+    slot = cache.incr('metrics:index:count')
+    cache.set('metrics:index:' + str(slot), key, None)
+
+
+# Every tenant and view with recorded metrics, as 'schema:view_name'
+def get_metrics_keys():
+    count = cache.get('metrics:index:count', 0)
+    slots = cache.get_many(['metrics:index:' + str(slot) for slot in range(1, count + 1)])
+    return sorted(set(slots.values()))
+
+
+# Middleware recording SQL, template, cache and external call time for every request
+class PerformanceMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_seconds = getattr(settings, 'SLOW_REQUEST_SECONDS', 1.0)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(query_timer):
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        elapsed = time.perf_counter() - started
+
+        metrics.counts['requests'] = 1
+        metrics.counts['request_us'] = int(elapsed * 1000000)
+        schema = connection.get_schema()
+        view_name = request.resolver_match.view_name if request.resolver_match else 'unresolved'
+        store_metrics(schema, view_name, metrics)
+
+        if elapsed >= self.slow_seconds:
+            worst = '\n'.join('%.1fms %s' % (duration * 1000, sql) for duration, sql in metrics.queries)
+            logger.warning('Slow request %s %s (%s, %s) %.0fms, %d queries\n%s',
+                request.method, request.path, schema, view_name, elapsed * 1000, metrics.counts['sql_queries'], worst)
+        return response
+
+
+# Export per-view totals in Prometheus text format, every tenant's for the state office, otherwise only the current tenant's
+def metrics(request):
+    if not is_site_manager(request) and not is_state_office(request):
+        return HttpResponseForbidden()
+
+    all_schemas = is_state_office(request)
+    current_schema = connection.get_schema()
+    lines = []
+    for key in get_metrics_keys():
+        schema, view_name = key.split(':', 1)
+        if not all_schemas and schema != current_schema:
+            continue
+        values = cache.get_many(['metrics:' + key + ':' + name for name in METRIC_NAMES])
+        for name in METRIC_NAMES:
+            value = values.get('metrics:' + key + ':' + name, 0)
+            if name.endswith('_us'):
+                name, value = name[:-3] + '_seconds_total', value / 1000000
+            else:
+                name = name + '_total'
+            lines.append('esports_%s{schema="%s",view="%s"} %s' % (name, schema, view_name, value))
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4')
@@ -0,0 +1,118 @@
+from urllib.parse import parse_qs
+#Django modules
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.layers import get_channel_layer
+from django.db import connection, transaction
+from django.urls import path
+from django_tenants.utils import get_tenant_domain_model, remove_www
+from esports.instrumentation import track_time
+
+# Record columns sent to subscribed pages for each team in a result
+LIVE_TEAM_FIELDS = ['wins', 'losses', 'ties', 'points']
+
+# Most league games one page can follow over its socket
+MAX_LIVE_LEAGUES = 20
+
+
+# Channel group for one tenant's league game
+def get_live_group(schema, league_game_id):
+    return 'live_results.' + schema + '.' + str(league_game_id)
+
+
+# Tenant schema for a websocket connection, resolved from the Host domain like the tenant middleware does for
+# the requests that publish results, so both sides name the same group (None for an unknown domain)
+def get_scope_schema(scope):
+    host = dict(scope['headers']).get(b'host', b'').decode()
+    hostname = remove_www(host.split(':')[0])
+    domain = get_tenant_domain_model().objects.select_related('tenant').filter(domain=hostname).first()
+    return domain.tenant.schema_name if domain is not None else None
+
+
+# League game ids a page asked to follow, from ?leagues=1,2,3
+def get_scope_league_ids(scope):
+    query = parse_qs(scope.get('query_string', b'').decode())
+    values = query.get('leagues', [''])[0].split(',')
+    return [int(value) for value in values if value.isdigit()][:MAX_LIVE_LEAGUES]
+
+
+# Compact description of a team for bracket slots
+def get_live_team(team):
+    if team is None:
+        return None
+    return {
+        'id':team.pk,
+        'seeding':team.seeding,
+        'name':str(team.school_team.school.school_name) if team.school_team_id else '',
+    }
+
+
+# Delta describing a submitted result: the match, both teams' records and any bracket slot it filled
+def get_result_delta(match, teams, next_match=None):
+    delta = {
+        'match':{
+            'id':match.pk,
+            'home_score':match.home_score,
+            'away_score':match.away_score,
+            'home_forfeit':match.home_forfeit,
+            'away_forfeit':match.away_forfeit,
+            'complete':match.complete,
+        },
+        'teams':[dict({'id':team.pk}, **{field:getattr(team, field) for field in LIVE_TEAM_FIELDS}) for team in teams],
+        'next_match':None,
+    }
+    if next_match is not None:
+        delta['next_match'] = {
+            'id':next_match.pk,
+            'home_team':get_live_team(next_match.home_team),
+            'away_team':get_live_team(next_match.away_team),
+        }
+    return delta
+
+
+# Send a result to subscribed pages once the submission has committed
+def publish_result(league_game_id, delta):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    group = get_live_group(connection.get_schema(), league_game_id)
+    transaction.on_commit(lambda: send_result(channel_layer, group, delta))
+
+
+# Deliver a result to the channel layer, timed as an external call
+def send_result(channel_layer, group, delta):
+    with track_time('external'):
+        async_to_sync(channel_layer.group_send)(group, {'type':'live.result', 'delta':delta})
+
+
+# Websocket consumer a page subscribes to for live results of every league game it shows, one socket per page
+class LiveResultsConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        self.group_names = []
+        schema = await database_sync_to_async(get_scope_schema)(self.scope)
+        league_ids = get_scope_league_ids(self.scope)
+        if schema is None or not league_ids:
+            await self.close()
+            return
+        self.group_names = [get_live_group(schema, league_game_id) for league_game_id in league_ids]
+        for group_name in self.group_names:
+            await self.channel_layer.group_add(group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        for group_name in self.group_names:
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+
+    # Viewers only receive results, anything they send is ignored
+    async def receive_json(self, content, **kwargs):
+        pass
+
+    async def live_result(self, event):
+        await self.send_json(event['delta'])
+
+
+# Added to the project's websocket router next to the match chat routes
+websocket_urlpatterns = [
+    path('ws/live-results/', LiveResultsConsumer.as_asgi()),
+]
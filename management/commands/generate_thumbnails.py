@@ -0,0 +1,14 @@
+#Django modules
+from django.core.management.base import BaseCommand
+from esports.views.thumbnails import refresh_thumbnails
+
+# Create the small school logo thumbnails the standings and bracket pages use
+class Command(BaseCommand):
+    help = 'Generate missing school logo thumbnails for every organization and cache their URLs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate every thumbnail, even if it already exists.')
+
+    def handle(self, *args, **options):
+        generated = refresh_thumbnails(force=options['force'])
+        self.stdout.write('Generated thumbnails for ' + str(generated) + ' logos.')
@@ -0,0 +1,36 @@
+#Django modules
+from django.core.management.base import BaseCommand, CommandError
+#Project models
+from esports.models import League_Game
+from esports.views.standings_ledger import rebuild_standings
+
+# Recompute League_Team records from completed matches and report (or fix) any drift
+# Run per tenant: ./manage.py tenant_command rebuild_standings --schema=<schema> [league_game_id ...] [--fix]
+class Command(BaseCommand):
+    help = 'Recompute team standings from completed matches and report mismatches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('league_game_ids', nargs='*', type=int, help='League games to check (defaults to all active league games).')
+        parser.add_argument('--fix', action='store_true', help='Write the recomputed totals back to the team records.')
+
+    def handle(self, *args, **options):
+        league_games = League_Game.objects.all()
+        if options['league_game_ids']:
+            league_games = league_games.filter(pk__in=options['league_game_ids'])
+            if len(league_games) != len(set(options['league_game_ids'])):
+                raise CommandError('One or more league games could not be found.')
+        else:
+            league_games = league_games.filter(activate=True)
+
+        total_mismatches = 0
+        for league_game in league_games:
+            mismatches = rebuild_standings(league_game, fix=options['fix'])
+            total_mismatches += len(mismatches)
+            for mismatch in mismatches:
+                changes = ', '.join(field + ': ' + str(stored) + ' -> ' + str(recorded) for field, (stored, recorded) in mismatch['changes'].items())
+                self.stdout.write(str(league_game) + ' | ' + str(mismatch['team'].school_team) + ' | ' + changes)
+
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS('Fixed ' + str(total_mismatches) + ' team record(s).'))
+        else:
+            self.stdout.write(self.style.WARNING(str(total_mismatches) + ' team record(s) differ from match history.'))
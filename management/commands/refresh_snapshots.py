@@ -0,0 +1,14 @@
+#Django modules
+from django.core.management.base import BaseCommand
+from esports.views.snapshots import refresh_snapshots
+
+# Regenerate the stored public page snapshots served to anonymous visitors
+class Command(BaseCommand):
+    help = 'Render each organization\'s public pages into compressed snapshots, skipping pages that are still fresh.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Render every page, even if its snapshot is still fresh.')
+
+    def handle(self, *args, **options):
+        refreshed = refresh_snapshots(force=options['force'])
+        self.stdout.write('Refreshed ' + str(refreshed) + ' page snapshots.')
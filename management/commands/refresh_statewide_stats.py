@@ -0,0 +1,17 @@
+#Django modules
+from django.core.management.base import BaseCommand
+from esports.views.statewide import MAX_WORKERS, refresh_statewide_summary
+
+# Rebuild the cached statewide summary across every organization's schema
+class Command(BaseCommand):
+    help = 'Aggregate match and standings numbers across all organizations, re-querying only changed schemas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-query every schema, even if its data has not changed.')
+        parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Schemas queried at the same time.')
+
+    def handle(self, *args, **options):
+        statewide = refresh_statewide_summary(force=options['force'], max_workers=options['workers'])
+        summary = statewide['summary']
+        self.stdout.write('Refreshed ' + str(len(statewide['refreshed'])) + ' of ' + str(summary['organizations']) + ' organizations.')
+        self.stdout.write('Matches played: ' + str(summary['matches_played']) + ', forfeit rate: ' + format(summary['forfeit_rate'], '.1%'))
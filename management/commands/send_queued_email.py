@@ -0,0 +1,25 @@
+import time
+#Django modules
+from django.core.management.base import BaseCommand
+from esports.views.email_queue import send_queued_email
+
+# Background worker that drains the outbound email spool in batches
+class Command(BaseCommand):
+    help = 'Send queued email in batches over a single mail connection, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages sent per mail connection.')
+        parser.add_argument('--loop', action='store_true', help='Keep running and poll the queue.')
+        parser.add_argument('--interval', type=int, default=10, help='Seconds between polls when looping.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, retried, failed = send_queued_email(options['batch_size'])
+            if sent or retried or failed:
+                self.stdout.write('Sent: ' + str(sent) + ' Retrying: ' + str(retried) + ' Failed: ' + str(failed))
+            # Keep draining full batches before sleeping
+            if sent + retried + failed == options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,17 @@
+#Django modules
+from django import template
+from django.templatetags.static import PrefixNode
+from esports.views.thumbnails import get_thumbnail_urls
+
+register = template.Library()
+
+
+# Render a school logo as a small WebP thumbnail with a PNG fallback, usage: {% school_logo image 'standings' %}
+@register.inclusion_tag('esports/school_logo.html')
+def school_logo(image, size, css_class='', style=''):
+    return {
+        'thumbnails':get_thumbnail_urls(image, size),
+        'original':PrefixNode.handle_simple('MEDIA_URL') + str(image or ''),
+        'css_class':css_class,
+        'style':style,
+    }
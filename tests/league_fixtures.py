@@ -0,0 +1,70 @@
+import datetime
+import math
+from esports.models import League_Game, League_Level, League_Team, Match, Match_Date, School, School_Team
+from esports.views.brackets import generate_bracket
+
+# Default size of a generated tenant, roughly a full statewide season
+DEFAULT_SCALE = {
+    'schools':300,
+    'league_games':4,
+    'conferences':4,
+    'bracket_size':16,
+    'weeks':8,
+}
+
+
+# Build a synthetic tenant season: schools, league games with conferences, weekly matches and a playoff bracket
+def build_league_season(schools=300, league_games=4, conferences=4, bracket_size=16, weeks=8, start_date=None):
+    start_date = start_date or datetime.date.today() - datetime.timedelta(days=7 * (weeks - 2))
+    champion = League_Level.objects.create(level_of_play="Champion")
+    contenders = League_Level.objects.create(level_of_play="Contenders")
+
+    school_rows = School.objects.bulk_create([School(school_name='School ' + str(num)) for num in range(schools)])
+    school_teams = School_Team.objects.bulk_create([
+        School_Team(team_name=school.school_name, school=school) for school in school_rows
+    ])
+
+    games = []
+    for game_num in range(league_games):
+        game = League_Game.objects.create(
+            activate=True,
+            series_length=3,
+            show_bracket=True,
+            league_level=champion if game_num % 2 == 0 else contenders,
+            league_season_name='Game ' + str(game_num) + ' Season',
+            playoff_team_count=bracket_size,
+            start_date=start_date,
+        )
+
+        # Every school fields a team in every league game, spread across the conferences
+        teams = League_Team.objects.bulk_create([
+            League_Team(
+                school_team=school_team,
+                league_game=game,
+                conference='Conference ' + str(num % conferences),
+                seeding=num + 1,
+            )
+            for num, school_team in enumerate(school_teams)
+        ])
+
+        # Weekly regular season matches pairing neighbouring teams in each conference
+        dates = Match_Date.objects.bulk_create([
+            Match_Date(league_game=game, match_date=start_date + datetime.timedelta(days=7 * week))
+            for week in range(weeks)
+        ])
+        matches = []
+        for week, match_date in enumerate(dates):
+            conf_teams = {}
+            for team in teams:
+                conf_teams.setdefault(team.conference, []).append(team)
+            for members in conf_teams.values():
+                members = members[week % len(members):] + members[:week % len(members)]
+                for home, away in zip(members[0::2], members[1::2]):
+                    matches.append(Match(home_team=home, away_team=away, match_date=match_date))
+
+        Match.objects.bulk_create(matches)
+
+        # Playoff bracket for the top seeds over the last weeks of the season
+        generate_bracket(teams[:bracket_size], dates[-int(math.log2(bracket_size)):])
+        games.append(game)
+    return games
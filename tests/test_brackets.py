@@ -0,0 +1,60 @@
+from django.test import SimpleTestCase, TestCase
+from esports.models import League_Game, League_Level, League_Team, Match, Match_Date, Match_Survey, School_Team
+from esports.views.brackets import generate_bracket, get_bracket_size, get_next_tourney_number, get_seed_order
+from esports.views.league_cache import get_league_version
+
+
+class BracketMathTests(SimpleTestCase):
+    def test_bracket_size_rounds_up_to_power_of_two(self):
+        self.assertEqual(get_bracket_size(6), 8)
+        self.assertEqual(get_bracket_size(16), 16)
+        self.assertEqual(get_bracket_size(33), 64)
+
+    def test_seed_order_keeps_top_seeds_apart(self):
+        self.assertEqual(get_seed_order(8), [1, 8, 4, 5, 2, 7, 3, 6])
+
+    def test_next_tourney_number(self):
+        # 8 team bracket: matches 1-4 feed 5-6, which feed the final (7)
+        self.assertEqual(get_next_tourney_number(1, 8), 5)
+        self.assertEqual(get_next_tourney_number(4, 8), 6)
+        self.assertEqual(get_next_tourney_number(6, 8), 7)
+        self.assertIsNone(get_next_tourney_number(7, 8))
+
+
+class GenerateBracketTests(TestCase):
+    def setUp(self):
+        level = League_Level.objects.create(level_of_play="Champion")
+        self.league_game = League_Game.objects.create(activate=True, series_length=3, show_bracket=True, league_level=level)
+        self.dates = [Match_Date.objects.create(league_game=self.league_game, match_date='2024-03-0' + str(day)) for day in (1, 2, 3)]
+        self.teams = []
+        for seed in range(1, 7):
+            school_team = School_Team.objects.create(team_name='School ' + str(seed))
+            self.teams.append(League_Team.objects.create(school_team=school_team, league_game=self.league_game, seeding=seed))
+
+    def test_six_team_bracket_gives_top_two_seeds_byes(self):
+        generate_bracket(self.teams, self.dates)
+
+        matches = {match.tourney_number:match for match in Match.objects.filter(tourney_match=True)}
+        self.assertEqual(len(matches), 7)
+
+        # Seeds 1 and 2 skip round 1 and wait in round 2
+        self.assertTrue(matches[1].complete)
+        self.assertIsNone(matches[1].away_team)
+        self.assertEqual(matches[5].home_team, self.teams[0])
+        self.assertEqual(matches[6].home_team, self.teams[1])
+
+        # Only the two real round 1 matches are open for reports
+        self.assertEqual(matches[2].home_team, self.teams[3])
+        self.assertEqual(matches[2].away_team, self.teams[4])
+        self.assertEqual(Match_Survey.objects.count(), 4)
+        self.assertEqual(League_Team.objects.filter(tournament_team=True, bracket_number=1).count(), 6)
+
+    def test_bracket_needs_one_date_per_round(self):
+        with self.assertRaises(ValueError):
+            generate_bracket(self.teams, self.dates[:2])
+
+    def test_generating_bracket_invalidates_league_cache(self):
+        version = get_league_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_bracket(self.teams, self.dates)
+        self.assertNotEqual(get_league_version(), version)
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.core import mail
+from django.test import SimpleTestCase, override_settings
+from esports.views.email_queue import FAILED, QUEUED, SENDING, SENT, claim_messages, get_queue_dir, queue_email, send_queued_email
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailQueueTests(SimpleTestCase):
+    def setUp(self):
+        # Use a throwaway spool folder for each test
+        self.queue_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(EMAIL_QUEUE_DIR=self.queue_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.queue_dir)
+
+    def test_queue_email_does_not_send_immediately(self):
+        queue_email('Join GSE Portal', 'Welcome', 'test@gse.com', ['coach@school.org'])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(os.listdir(get_queue_dir(QUEUED))), 1)
+
+    def test_worker_sends_batch(self):
+        queue_email('Join GSE Portal', 'Welcome', 'test@gse.com', ['coach1@school.org'])
+        queue_email('Join GSE Portal', 'Welcome', 'test@gse.com', ['coach2@school.org'])
+
+        self.assertEqual(send_queued_email(), (2, 0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(len(os.listdir(get_queue_dir(SENT))), 2)
+        self.assertEqual(os.listdir(get_queue_dir(QUEUED)), [])
+
+    def test_failed_send_is_retried_later(self):
+        queue_email('Join GSE Portal', 'Welcome', 'test@gse.com', ['coach@school.org'])
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')):
+            self.assertEqual(send_queued_email(), (0, 1, 0))
+
+        # The message waits out its backoff before being picked up again
+        self.assertEqual(len(os.listdir(get_queue_dir(QUEUED))), 1)
+        self.assertEqual(send_queued_email(), (0, 0, 0))
+
+    def test_message_fails_after_max_attempts(self):
+        queue_email('Join GSE Portal', 'Welcome', 'test@gse.com', ['coach@school.org'])
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')), \
+                mock.patch('esports.views.email_queue.RETRY_BASE_SECONDS', 0), \
+                mock.patch('esports.views.email_queue.MAX_ATTEMPTS', 2):
+            send_queued_email()
+            self.assertEqual(send_queued_email(), (0, 0, 1))
+        self.assertEqual(len(os.listdir(get_queue_dir(FAILED))), 1)
+
+    def test_crashed_worker_messages_are_sent_later(self):
+        queue_email('Join GSE Portal', 'Welcome', 'test@gse.com', ['coach@school.org'])
+
+        # A worker claims the message and dies before sending it
+        claim_messages(10)
+        self.assertEqual(send_queued_email(), (0, 0, 0))
+
+        with mock.patch('esports.views.email_queue.SENDING_TIMEOUT_SECONDS', 0):
+            self.assertEqual(send_queued_email(), (1, 0, 0))
+        self.assertEqual(os.listdir(get_queue_dir(SENDING)), [])
@@ -0,0 +1,76 @@
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from esports.instrumentation import PerformanceMiddleware, RequestMetrics, get_metrics_keys, metrics, record_cache, store_metrics, track_time
+from esports.models import Org_League
+from esports.views.roles import SITE_MANAGER_GROUP
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        # A view that queries the database, hits the cache and makes an external call
+        list(Org_League.objects.all())
+        record_cache(True)
+        with track_time('external'):
+            pass
+        return HttpResponse('ok')
+
+    def test_middleware_records_per_view_totals(self):
+        middleware = PerformanceMiddleware(self.view)
+        middleware(self.factory.get('/'))
+        middleware(self.factory.get('/'))
+
+        prefix = 'metrics:' + connection.get_schema() + ':unresolved:'
+        self.assertEqual(cache.get(prefix + 'requests'), 2)
+        self.assertEqual(cache.get(prefix + 'sql_queries'), 2)
+        self.assertEqual(cache.get(prefix + 'cache_hits'), 2)
+        self.assertEqual(cache.get(prefix + 'external_calls'), 2)
+
+    def test_each_view_is_indexed_once(self):
+        middleware = PerformanceMiddleware(self.view)
+        middleware(self.factory.get('/'))
+        middleware(self.factory.get('/'))
+        self.assertEqual(get_metrics_keys(), [connection.get_schema() + ':unresolved'])
+
+    @override_settings(SLOW_REQUEST_SECONDS=0)
+    def test_slow_request_is_logged_with_queries(self):
+        with self.assertLogs('esports.performance', level='WARNING') as logs:
+            PerformanceMiddleware(self.view)(self.factory.get('/slow/'))
+        self.assertIn('/slow/', logs.output[0])
+        self.assertIn('org_league', logs.output[0].lower())
+
+    def test_metrics_endpoint_requires_site_manager(self):
+        request = self.factory.get('/metrics/')
+        request.user = AnonymousUser()
+        self.assertEqual(metrics(request).status_code, 403)
+
+    def metrics_request(self, user):
+        request = self.factory.get('/metrics/')
+        request.user = user
+        request.session = {}
+        return request
+
+    def test_metrics_endpoint_only_shows_own_tenant_to_site_manager(self):
+        request_metrics = RequestMetrics()
+        request_metrics.counts['requests'] = 1
+        store_metrics('gse', 'ticker', request_metrics)
+        store_metrics('other', 'ticker', request_metrics)
+        user = User.objects.create_user('manager', password='password')
+        user.groups.add(Group.objects.create(name=SITE_MANAGER_GROUP))
+
+        with mock.patch.object(connection, 'get_schema', return_value='gse'):
+            body = metrics(self.metrics_request(user)).content.decode()
+        self.assertIn('schema="gse"', body)
+        self.assertNotIn('schema="other"', body)
+
+        user.is_superuser = True
+        with mock.patch.object(connection, 'get_schema', return_value='gse'):
+            body = metrics(self.metrics_request(user)).content.decode()
+        self.assertIn('schema="other"', body)
@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from django.core.cache import cache
+from django.db import connection
+from django.test import tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.test.client import TenantClient
+from esports.models import Match, Match_Survey, Org_League
+from esports.views.league_view import submit_scores
+from esports.tests.league_fixtures import DEFAULT_SCALE, build_league_season
+
+# Maximum queries each view may run on a cold cache, whatever the tenant size
+QUERY_BUDGETS = {
+    'competitions':15,
+    'competitions_fragment':10,
+    'ticker':5,
+    'ticker_feed':3,
+    'submit_scores':20,
+}
+
+# Schools in the default test run, set LEAGUE_BENCH_SCHOOLS=300 to benchmark at full scale
+QUICK_SCHOOLS = 40
+SCALE = dict(DEFAULT_SCALE, schools=int(os.environ.get('LEAGUE_BENCH_SCHOOLS', QUICK_SCHOOLS)))
+
+# Optional path to write the measurements to as JSON
+BENCH_OUTPUT = os.environ.get('LEAGUE_BENCH_OUTPUT')
+
+
+@tag('benchmark')
+class LeagueViewBenchmarks(TenantTestCase):
+    results = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.league_games = build_league_season(**SCALE)
+
+    @classmethod
+    def tearDownClass(cls):
+        if BENCH_OUTPUT:
+            with open(BENCH_OUTPUT, 'w') as output:
+                json.dump({'scale':SCALE, 'results':cls.results}, output, indent=2)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = TenantClient(self.tenant)
+        Org_League.objects.get_or_create(org_schema='gse', defaults={'org_name':'Garden State Esports', 'org_email':'test@gse.com'})
+        # Measure cold renders, every view rebuilds from the database
+        cache.clear()
+
+    def measure(self, name, run):
+        # Record query count, wall time and response size, and enforce the view's query budget
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = run()
+            elapsed = time.perf_counter() - started
+        self.results[name] = {
+            'queries':len(queries.captured_queries),
+            'seconds':round(elapsed, 4),
+            'bytes':len(response.content) if response is not None else 0,
+        }
+        self.assertLessEqual(len(queries.captured_queries), QUERY_BUDGETS[name], name + ' exceeded its query budget')
+        return response
+
+    def test_competitions_query_budget(self):
+        response = self.measure('competitions', lambda: self.client.get(reverse('competitions')))
+        self.assertEqual(response.status_code, 200)
+
+    def test_competitions_fragment_query_budget(self):
+        url = reverse('competitions_fragment', args=['standings', self.league_games[-1].pk])
+        response = self.measure('competitions_fragment', lambda: self.client.get(url))
+        self.assertEqual(response.status_code, 200)
+
+    def test_ticker_query_budget(self):
+        response = self.measure('ticker', lambda: self.client.get(reverse('ticker')))
+        self.assertEqual(response.status_code, 200)
+
+    def test_ticker_feed_query_budget(self):
+        response = self.measure('ticker_feed', lambda: self.client.get(reverse('ticker_feed')))
+        self.assertEqual(response.status_code, 200)
+
+    def test_submit_scores_query_budget(self):
+        match = Match.objects.filter(match_date__league_game=self.league_games[0], tourney_match=True, tourney_number=1).select_related(
+            'match_date__league_game__league_level', 'home_team__league_game', 'away_team__league_game',
+        ).get()
+        home_report = Match_Survey.objects.create(match=match, team=match.home_team, other_team=match.away_team, team_score=2, other_score=0,
+            team_forfeit=False, other_forfeit=False, team_othersportsmanship=5, team_otherontime=True, roster_correct="Yes", scouting_correct="Yes")
+        away_report = Match_Survey.objects.create(match=match, team=match.away_team, other_team=match.home_team, team_score=0, other_score=2,
+            team_forfeit=False, other_forfeit=False, team_othersportsmanship=5, team_otherontime=True, roster_correct="Yes", scouting_correct="Yes")
+        self.measure('submit_scores', lambda: submit_scores(match, home_report, away_report))
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django_tenants.test.cases import TenantTestCase
+from esports.views.league_cache import get_league_fragment, get_league_version, invalidate_league_cache
+
+
+class LeagueCacheTests(TenantTestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def build(self):
+        # Count how many times the fragment is rebuilt
+        self.builds += 1
+        return ['fragment', self.builds]
+
+    def test_fragment_is_built_once_per_version(self):
+        first = get_league_fragment('standings', self.build)
+        second = get_league_fragment('standings', self.build)
+        self.assertEqual(first, second)
+        self.assertEqual(self.builds, 1)
+
+    def test_invalidate_rebuilds_fragment(self):
+        get_league_fragment('standings', self.build)
+        invalidate_league_cache()
+        fragment = get_league_fragment('standings', self.build)
+        self.assertEqual(fragment, ['fragment', 2])
+
+    def test_evicted_version_does_not_reuse_old_fragments(self):
+        get_league_fragment('standings', self.build)
+
+        # Losing the version key must not bring back a version old fragments were stored under
+        cache.delete('league:' + self.tenant.schema_name + ':version')
+        get_league_version()
+        fragment = get_league_fragment('standings', self.build)
+        self.assertEqual(fragment, ['fragment', 2])
+
+    def test_concurrent_miss_serves_stale_fragment(self):
+        get_league_fragment('standings', self.build)
+        invalidate_league_cache()
+
+        # Simulate another worker holding the rebuild lock for this fragment
+        lock_key = 'league:' + self.tenant.schema_name + ':standings:lock'
+        cache.add(lock_key, 1, 30)
+        fragment = get_league_fragment('standings', self.build)
+        self.assertEqual(fragment, ['fragment', 1])
+        self.assertEqual(self.builds, 1)
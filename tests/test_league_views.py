@@ -4,7 +4,10 @@ from django_tenants.test.client import TenantClient
 from django_tenants.utils import get_tenant_domain_model, schema_context
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
 from esports.models import Organization, Org_League
+from esports.views.roles import SITE_MANAGER_GROUP
+from esports.tests.league_fixtures import build_league_season
 
 
 class LeagueViewTests(TenantTestCase):
@@ -90,3 +93,68 @@ class LeagueViewTests(TenantTestCase):
         response = self.client.get(reverse('ticker'), HTTP_HOST=self.domain_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'esports/ticker.html')
+
+    def test_org_lookup_is_cached_between_requests(self):
+        # Warm the organization cache, later page views should not query Org_League again
+        self.client.get(reverse('index'), HTTP_HOST=self.domain_url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('index'), HTTP_HOST=self.domain_url)
+        self.assertEqual(response.context['org'].org_schema, 'gse')
+        self.assertFalse(any('org_league' in query['sql'].lower() for query in queries.captured_queries))
+
+    def test_org_cache_refreshes_when_org_is_saved(self):
+        self.client.get(reverse('index'), HTTP_HOST=self.domain_url)
+        org = Org_League.objects.get(org_schema='gse')
+        org.org_email = 'new@gse.com'
+        org.save()
+        response = self.client.get(reverse('index'), HTTP_HOST=self.domain_url)
+        self.assertEqual(response.context['org'].org_email, 'new@gse.com')
+
+    def test_roles_refresh_when_groups_change(self):
+        # Load the user's site manager membership into the session, then remove them from every group
+        self.user.groups.add(Group.objects.create(name=SITE_MANAGER_GROUP))
+        response = self.client.get(reverse('index'), HTTP_HOST=self.domain_url)
+        self.assertTrue(response.context['is_admin'])
+        self.user.groups.clear()
+        response = self.client.get(reverse('index'), HTTP_HOST=self.domain_url)
+        self.assertFalse(response.context['is_admin'])
+        self.assertNotContains(response, 'Dashboard')
+
+    def test_ticker_embed_serves_polling_client(self):
+        response = self.client.get(reverse('ticker_embed'), HTTP_HOST=self.domain_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse('ticker_feed'))
+
+    def test_ticker_feed_returns_json_with_etag(self):
+        response = self.client.get(reverse('ticker_feed'), HTTP_HOST=self.domain_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertEqual(response.json()['matches'], [])
+
+    def test_ticker_feed_not_modified_for_matching_etag(self):
+        response = self.client.get(reverse('ticker_feed'), HTTP_HOST=self.domain_url)
+        response = self.client.get(reverse('ticker_feed'), HTTP_HOST=self.domain_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_competitions_groups_upcoming_matches(self):
+        # A small season with one Champion and one Contenders league game playing this week
+        build_league_season(schools=8, league_games=2, conferences=2, bracket_size=4, weeks=3)
+        response = self.client.get(reverse('competitions'), HTTP_HOST=self.domain_url)
+        grouped = 0
+        for upcoming in response.context['champion_upcoming'] + response.context['contenders_upcoming']:
+            for day in upcoming['dates']:
+                for conference in day['conferences']:
+                    for match in conference['matches']:
+                        self.assertEqual(match['match_date__league_game_id'], upcoming['league'].id)
+                        self.assertEqual(match['match_date__match_date'], day['date'])
+                        self.assertEqual(match['home_team__conference'], conference['name'])
+                        grouped += 1
+        self.assertGreater(grouped, 0)
+
+    def test_competitions_fragment_unknown_league(self):
+        response = self.client.get(reverse('competitions_fragment', args=['standings', 999999]), HTTP_HOST=self.domain_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_competitions_fragment_unknown_section(self):
+        response = self.client.get(reverse('competitions_fragment', args=['schedule', 1]), HTTP_HOST=self.domain_url)
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,71 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test import override_settings
+from django_tenants.test.cases import TenantTestCase
+from esports.live_results import get_live_group, publish_result, websocket_urlpatterns
+
+IN_MEMORY_LAYERS = {'default':{'BACKEND':'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class LiveResultsTests(TenantTestCase):
+    def setUp(self):
+        self.delta = {
+            'match':{'id':1, 'home_score':2, 'away_score':1, 'home_forfeit':False, 'away_forfeit':False, 'complete':True},
+            'teams':[{'id':1, 'wins':1, 'losses':0, 'ties':0, 'points':3}],
+            'next_match':None,
+        }
+
+    def get_communicator(self, path, host=None):
+        host = host or self.domain.domain
+        return WebsocketCommunicator(URLRouter(websocket_urlpatterns), path, headers=[(b'host', host.encode())])
+
+    # Publish from the tenant's request thread, as a score submission would
+    def publish(self, league_game_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_result(league_game_id, self.delta)
+
+    def test_result_is_published_after_commit(self):
+        channel_layer = get_channel_layer()
+        group = get_live_group(connection.get_schema(), 7)
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(group, channel)
+
+        # Results are only sent once the submission's transaction commits
+        self.publish(7)
+
+        message = async_to_sync(channel_layer.receive)(channel)
+        self.assertEqual(message['type'], 'live.result')
+        self.assertEqual(message['delta'], self.delta)
+
+    def test_published_result_reaches_page(self):
+        async def run():
+            communicator = self.get_communicator('/ws/live-results/?leagues=7')
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await sync_to_async(self.publish)(7)
+            self.assertEqual(await communicator.receive_json_from(), self.delta)
+            await communicator.disconnect()
+        async_to_sync(run)()
+
+    def test_one_socket_follows_every_league_on_page(self):
+        async def run():
+            communicator = self.get_communicator('/ws/live-results/?leagues=7,8')
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await sync_to_async(self.publish)(8)
+            self.assertEqual(await communicator.receive_json_from(), self.delta)
+            await sync_to_async(self.publish)(9)
+            self.assertTrue(await communicator.receive_nothing())
+            await communicator.disconnect()
+        async_to_sync(run)()
+
+    def test_unknown_domain_is_rejected(self):
+        async def run():
+            communicator = self.get_communicator('/ws/live-results/?leagues=7', host='unknown.esportsforedu.com')
+            connected, _ = await communicator.connect()
+            self.assertFalse(connected)
+        async_to_sync(run)()
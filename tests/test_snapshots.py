@@ -0,0 +1,54 @@
+import gzip
+from unittest import mock
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.urls import reverse
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.test.client import TenantClient
+from esports.models import Org_League
+from esports.views.league_cache import invalidate_league_cache
+from esports.views.snapshots import get_snapshot_key
+from esports.views.tenant import get_host_org_schema
+
+
+class SnapshotTests(TenantTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = TenantClient(self.tenant)
+        # Snapshots are keyed like get_org, by the subdomain's organization schema rather than the tenant schema
+        self.org_schema = get_host_org_schema(self.domain.domain)
+
+    def test_anonymous_page_is_stored_compressed(self):
+        response = self.client.get(reverse('ticker'))
+        snapshot = cache.get(get_snapshot_key(self.org_schema, reverse('ticker')))
+        self.assertEqual(gzip.decompress(snapshot['body']), response.content)
+
+    def test_fresh_snapshot_is_served_without_rendering(self):
+        self.client.get(reverse('ticker'))
+        with mock.patch('esports.views.league_view.get_league_fragment') as get_league_fragment:
+            response = self.client.get(reverse('ticker'), HTTP_ACCEPT_ENCODING='gzip')
+        get_league_fragment.assert_not_called()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_stale_snapshot_served_when_database_fails(self):
+        first = self.client.get(reverse('ticker'))
+        invalidate_league_cache()
+        with mock.patch('esports.views.league_view.get_league_fragment', side_effect=DatabaseError):
+            response = self.client.get(reverse('ticker'))
+        self.assertEqual(response.content, first.content)
+
+    def test_org_change_drops_snapshots(self):
+        org = Org_League.objects.create(org_name='Garden State Esports', org_schema=self.org_schema, org_email='test@gse.com')
+        self.client.get(reverse('ticker'))
+        self.assertIsNotNone(cache.get(get_snapshot_key(self.org_schema, reverse('ticker'))))
+        org.save()
+        self.assertIsNone(cache.get(get_snapshot_key(self.org_schema, reverse('ticker'))))
+
+    def test_cold_page_waits_for_render_in_progress(self):
+        # Another request holds the render lock and there is no snapshot to fall back on
+        cache.add(get_snapshot_key(self.org_schema, reverse('ticker')) + ':lock', 'rendering', 30)
+        with mock.patch('esports.views.league_view.get_league_fragment') as get_league_fragment:
+            response = self.client.get(reverse('ticker'))
+        get_league_fragment.assert_not_called()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
@@ -0,0 +1,110 @@
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from esports.views.roles import SITE_MANAGER_GROUP
+from esports.views.statewide import STATEWIDE_KEY, merge_summaries, refresh_statewide_summary, statewide_summary
+
+
+# Per-schema summary as get_schema_summary builds it
+def make_summary(schema, version=1, matches_played=10, forfeits=0, ontime=0, sportsmanship=None, points=0):
+    return {
+        'schema':schema,
+        'version':version,
+        'totals':{
+            'matches_played':matches_played,
+            'home_forfeits':forfeits,
+            'away_forfeits':0,
+            'home_sportsmanship':sportsmanship,
+            'away_sportsmanship':sportsmanship,
+            'home_ontime':ontime,
+            'away_ontime':0,
+        },
+        'leaders':[{'schema':schema, 'league':'League', 'school':schema + ' High', 'wins':points // 3, 'losses':0, 'ties':0, 'points':points}],
+    }
+
+
+class MergeSummariesTests(SimpleTestCase):
+    def test_rates_are_weighted_by_matches_played(self):
+        merged = merge_summaries({
+            'gse':make_summary('gse', matches_played=10, forfeits=2, ontime=20, sportsmanship=4.0, points=9),
+            'nse':make_summary('nse', matches_played=30, forfeits=2, ontime=40, sportsmanship=2.0, points=12),
+        })
+        self.assertEqual(merged['organizations'], 2)
+        self.assertEqual(merged['matches_played'], 40)
+        self.assertEqual(merged['forfeit_rate'], 4 / 80)
+        self.assertEqual(merged['ontime_rate'], 60 / 80)
+        self.assertEqual(merged['average_sportsmanship'], 2.5)
+        self.assertEqual([leader['schema'] for leader in merged['leaders']], ['nse', 'gse'])
+
+    def test_empty_season_has_no_rates(self):
+        merged = merge_summaries({'gse':make_summary('gse', matches_played=0)})
+        self.assertEqual(merged['forfeit_rate'], 0)
+        self.assertIsNone(merged['average_sportsmanship'])
+
+
+class RefreshStatewideTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.versions = {'gse':1, 'nse':1}
+        tenants = mock.Mock()
+        tenants.objects.exclude.return_value.values_list.return_value = ['gse', 'nse']
+        patches = [
+            mock.patch('esports.views.statewide.get_tenant_model', return_value=tenants),
+            mock.patch('esports.views.statewide.get_league_version', side_effect=lambda schema: self.versions[schema]),
+            mock.patch('esports.views.statewide.run_schema_summary', side_effect=self.run_schema_summary),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.failing = set()
+
+    def run_schema_summary(self, schema):
+        if schema in self.failing:
+            raise RuntimeError('schema unavailable')
+        return make_summary(schema, version=self.versions[schema])
+
+    def test_only_changed_schemas_are_requeried(self):
+        self.assertEqual(sorted(refresh_statewide_summary()['refreshed']), ['gse', 'nse'])
+        self.versions['nse'] = 2
+        statewide = refresh_statewide_summary()
+        self.assertEqual(statewide['refreshed'], ['nse'])
+        self.assertEqual(statewide['schemas']['nse']['version'], 2)
+
+    def test_failing_schema_keeps_last_summary(self):
+        refresh_statewide_summary()
+        self.versions = {'gse':2, 'nse':2}
+        self.failing.add('gse')
+        with self.assertLogs('esports.statewide', level='ERROR'):
+            statewide = refresh_statewide_summary()
+        self.assertEqual(statewide['schemas']['gse']['version'], 1)
+        self.assertEqual(statewide['schemas']['nse']['version'], 2)
+
+
+class StatewideViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def get(self, user):
+        request = self.factory.get('/statewide/')
+        request.user = user
+        request.session = {}
+        return statewide_summary(request)
+
+    def test_organization_site_manager_is_refused(self):
+        self.assertEqual(self.get(AnonymousUser()).status_code, 403)
+        user = User.objects.create_user('manager', password='password')
+        user.groups.add(Group.objects.create(name=SITE_MANAGER_GROUP))
+        with mock.patch('esports.views.roles.connection') as connection:
+            connection.get_schema.return_value = 'gse'
+            self.assertEqual(self.get(user).status_code, 403)
+
+    def test_missing_summary_returns_503(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        response = self.get(user)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '300')
+
+        cache.set(STATEWIDE_KEY, {'summary':{'organizations':1}}, None)
+        self.assertEqual(self.get(user).status_code, 200)
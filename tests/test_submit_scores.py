@@ -1,6 +1,8 @@
 from django.test import TestCase
 from esports.models import League_Game, Match, League_Team, Match_Survey, Match_Date, League_Level, Player, School_Team, School_Team_Player
 from esports.views.league_views import submit_scores
+from esports.views.score_ingestion import submit_league_scores
+from esports.views.standings_ledger import rebuild_standings
 
 class SubmitScoresTests(TestCase):
     def setUp(self):
@@ -124,3 +126,81 @@ class SubmitScoresTests(TestCase):
         # Assert that match survey reports were deleted
         self.assertFalse(Match_Survey.objects.filter(pk=self.home_report.pk).exists())
         self.assertFalse(Match_Survey.objects.filter(pk=self.away_report.pk).exists())
+
+    def test_submit_scores_increments_current_database_totals(self):
+        # Simulate another submission finishing for the same team after this match was loaded
+        League_Team.objects.filter(pk=self.team1.pk).update(wins=5, points=15)
+
+        submit_scores(self.match, self.home_report, self.away_report)
+
+        # The win is added to the stored total rather than overwriting it with stale values
+        self.team1.refresh_from_db()
+        self.assertEqual(self.team1.wins, 6)
+        self.assertEqual(self.team1.points, 18)
+        self.assertEqual(self.team1.score_for, 2)
+        self.assertEqual(self.team1.score_against, 1)
+
+    def test_submit_scores_ignores_already_completed_match(self):
+        # The other coach's submission finished the match first
+        Match.objects.filter(pk=self.match.pk).update(complete=True)
+
+        submit_scores(self.match, self.home_report, self.away_report)
+
+        # The result is not counted a second time
+        self.team1.refresh_from_db()
+        self.assertEqual(self.team1.wins, 0)
+        self.assertEqual(self.team1.points, 0)
+        self.assertFalse(Match_Survey.objects.filter(match=self.match).exists())
+
+    def test_submit_scores_uses_current_team_slots(self):
+        # Seeding swapped the teams after the caller loaded the match
+        Match.objects.filter(pk=self.match.pk).update(home_team=self.team2, away_team=self.team1)
+        self.home_report.team, self.home_report.other_team = self.team2, self.team1
+        self.away_report.team, self.away_report.other_team = self.team1, self.team2
+
+        submit_scores(self.match, self.home_report, self.away_report)
+
+        # The home report's win goes to the team now in the home slot
+        self.team2.refresh_from_db()
+        self.assertEqual(self.team2.wins, 1)
+
+    def test_submit_league_scores_processes_paired_reports(self):
+        # Only reports marked complete by both coaches are ready for processing
+        Match_Survey.objects.filter(match=self.match).update(complete=True)
+
+        results = submit_league_scores(self.league_game)
+
+        self.match.refresh_from_db()
+        self.team1.refresh_from_db()
+        self.team2.refresh_from_db()
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0]['complete'])
+        self.assertTrue(self.match.complete)
+        self.assertEqual(self.team1.points, 3)
+        self.assertEqual(self.team2.losses, 1)
+        self.assertFalse(Match_Survey.objects.filter(match=self.match).exists())
+
+    def test_submit_league_scores_skips_unpaired_reports(self):
+        # The away coach has not finished their report yet
+        Match_Survey.objects.filter(pk=self.home_report.pk).update(complete=True)
+
+        results = submit_league_scores(self.league_game)
+
+        self.match.refresh_from_db()
+        self.assertEqual(len(results), 1)
+        self.assertFalse(results[0]['complete'])
+        self.assertFalse(self.match.complete)
+        self.assertTrue(Match_Survey.objects.filter(pk=self.away_report.pk).exists())
+
+    def test_rebuild_standings_repairs_drift(self):
+        submit_scores(self.match, self.home_report, self.away_report)
+
+        # Corrupt the stored record, then rebuild it from completed matches
+        League_Team.objects.filter(pk=self.team1.pk).update(wins=4, points=12)
+        mismatches = rebuild_standings(self.league_game, fix=True)
+
+        self.team1.refresh_from_db()
+        self.assertEqual(len(mismatches), 1)
+        self.assertEqual(mismatches[0]['changes']['wins'], (4, 1))
+        self.assertEqual(self.team1.wins, 1)
+        self.assertEqual(self.team1.points, 3)
@@ -0,0 +1,56 @@
+import io
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from esports.views.thumbnails import ensure_thumbnails, get_thumbnail_name, get_thumbnail_urls
+
+
+class ThumbnailTests(SimpleTestCase):
+    def setUp(self):
+        # Store media in a throwaway folder with one large school logo
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/')
+        self.settings_override.enable()
+        cache.clear()
+        logo = io.BytesIO()
+        Image.new('RGB', (1200, 1000), 'blue').save(logo, format='PNG')
+        self.image_name = default_storage.save('schools/logo.png', ContentFile(logo.getvalue()))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_rendering_falls_back_to_original_until_generated(self):
+        self.assertIsNone(get_thumbnail_urls(self.image_name, 'standings'))
+        self.assertFalse(default_storage.exists(get_thumbnail_name(self.image_name, 'standings', 'webp')))
+
+    def test_generated_thumbnails_are_served(self):
+        self.assertTrue(ensure_thumbnails(self.image_name))
+        urls = get_thumbnail_urls(self.image_name, 'standings')
+        self.assertTrue(urls['webp'].endswith('/thumbnails/120x100/schools/logo.png.webp'))
+        self.assertTrue(urls['png'].endswith('/thumbnails/120x100/schools/logo.png.png'))
+
+        with default_storage.open(get_thumbnail_name(self.image_name, 'standings', 'webp')) as thumbnail:
+            self.assertLessEqual(Image.open(thumbnail).size, (120, 100))
+
+    def test_existing_thumbnails_are_only_recached(self):
+        ensure_thumbnails(self.image_name)
+        cache.clear()
+        self.assertFalse(ensure_thumbnails(self.image_name))
+        self.assertIsNotNone(get_thumbnail_urls(self.image_name, 'bracket'))
+
+    def test_logos_with_different_extensions_keep_separate_thumbnails(self):
+        self.assertNotEqual(
+            get_thumbnail_name('schools/logo.png', 'standings', 'webp'),
+            get_thumbnail_name('schools/logo.jpg', 'standings', 'webp'),
+        )
+
+    def test_missing_logo_falls_back_to_original(self):
+        with self.assertRaises(OSError):
+            ensure_thumbnails('schools/missing.png')
+        self.assertIsNone(get_thumbnail_urls('schools/missing.png', 'standings'))
+        self.assertIsNone(get_thumbnail_urls('', 'standings'))
@@ -0,0 +1,179 @@
+import math
+from collections import defaultdict
+#Django modules
+from django.db import connection, transaction
+from django.db.models import Max
+#Project models
+from esports.models import League_Team, Match, Match_Survey
+from esports.views.league_cache import invalidate_league_cache
+
+# Build the playoff bracket tree (league -> bracket -> round -> slot) for leagues showing a bracket
+def build_bracket_leagues(leagues):
+    leagues = [league for league in leagues if league.show_bracket]
+    if not leagues:
+        return []
+
+    # Load every tournament match for the leagues once, with teams and schools joined in
+    tourney_matches = Match.objects.filter(match_date__league_game__in=leagues, tourney_match=True)
+    tourney_matches = tourney_matches.select_related(
+        'match_date',
+        'home_team__school_team__school',
+        'away_team__school_team__school',
+    ).order_by('match_date__match_date', 'tourney_number')
+
+    # Group matches by league and bracket number, keeping date/slot order
+    league_matches = defaultdict(lambda: defaultdict(list))
+    for match in tourney_matches:
+        league_matches[match.match_date.league_game_id][match.bracket_number].append(match)
+
+    bracket_leagues = []
+    for league in leagues:
+        brackets = league_matches[league.id]
+        bracket_leagues.append({
+            'league':league,
+            'brackets':[build_bracket(num, brackets[num]) for num in sorted(brackets)],
+        })
+    return bracket_leagues
+
+
+# Split one bracket's matches into rounds by match date, the last date being the championship
+def build_bracket(bracket_number, matches):
+    champ_number = max(match.tourney_number for match in matches)
+
+    round_dates = {}
+    round_matches = defaultdict(list)
+    for match in matches:
+        round_dates.setdefault(match.match_date_id, match.match_date)
+        round_matches[match.match_date_id].append(match)
+
+    rounds = []
+    round_count = len(round_dates)
+    for counter, date_id in enumerate(round_dates, start=1):
+        is_final = counter == round_count
+        if is_final:
+            slots = [match for match in round_matches[date_id] if match.tourney_number == champ_number]
+            label = 'Championship'
+        else:
+            slots = [match for match in round_matches[date_id] if match.tourney_number < champ_number]
+            label = 'Semi-Finals' if counter == round_count - 1 else 'Round ' + str(counter)
+        rounds.append({
+            'number':counter,
+            'label':label,
+            'date':round_dates[date_id],
+            'is_final':is_final,
+            'matches':slots,
+        })
+
+    return {'number':bracket_number, 'rounds':rounds}
+
+
+# Tournament number of the match a winner advances to, or None after the championship
+# Round 1 holds matches 1..size/2, and matches 2n-1 and 2n feed the next round's match size/2+n
+def get_next_tourney_number(tourney_number, team_count):
+    round1_count = team_count/2
+    tourn_num = math.ceil(tourney_number/2)
+    next_match_num = int(round1_count + tourn_num)
+    if next_match_num <= team_count - 1:
+        return next_match_num
+    return None
+
+
+# Place the match winner in the next match's home (odd feeder) or away (even feeder) slot
+def seat_winner(match, next_match, home_team, away_team):
+    winner = home_team if match.home_score > match.away_score else away_team
+    if match.tourney_number%2==1:
+        next_match.home_team = winner
+        return 'home_team'
+    next_match.away_team = winner
+    return 'away_team'
+
+
+# Give the better seed the home slot once both teams are known, returns True if the teams were swapped
+def seed_next_match(next_match):
+    if next_match.home_team.seeding > next_match.away_team.seeding:
+        next_match.home_team, next_match.away_team = next_match.away_team, next_match.home_team
+        return True
+    return False
+
+
+# Blank surveys for both teams of a newly filled tournament match
+def get_tourney_surveys(next_match):
+    home_survey = Match_Survey(match=next_match, team = next_match.home_team, other_team = next_match.away_team, team_score = 0, other_score=0,team_forfeit=False,other_forfeit=False,team_pog=None,other_pog=None,complete=False,tourney_survey=True)
+    away_survey = Match_Survey(match=next_match, team = next_match.away_team, other_team = next_match.home_team, team_score = 0, other_score=0,team_forfeit=False,other_forfeit=False,team_pog=None,other_pog=None,complete=False,tourney_survey=True)
+    return [home_survey, away_survey]
+
+
+# Number of slots in a single-elimination bracket (the next power of two)
+def get_bracket_size(team_count):
+    return 2 ** math.ceil(math.log2(max(team_count, 2)))
+
+
+# Bracket size for a bracket's existing tournament matches (a full bracket has size - 1 matches)
+def get_bracket_matches_size(tourney_matches):
+    last_number = tourney_matches.aggregate(last=Max('tourney_number'))['last']
+    return last_number + 1 if last_number else 0
+
+
+# Seed numbers in round 1 slot order, so 1 and 2 can only meet in the final (1, 16, 8, 9, ...)
+def get_seed_order(size):
+    order = [1]
+    while len(order) < size:
+        slot_count = len(order) * 2
+        order = [seed for top in order for seed in (top, slot_count + 1 - top)]
+    return order
+
+
+# Create a full single-elimination bracket for seeded teams, giving top seeds byes when the field isn't a power of two
+def generate_bracket(teams, round_dates, bracket_number=1):
+    teams = sorted(teams, key=lambda team: team.seeding)
+    if len(teams) < 2:
+        raise ValueError('A bracket needs at least two teams.')
+    size = get_bracket_size(len(teams))
+    if len(round_dates) != int(math.log2(size)):
+        raise ValueError('A ' + str(size) + ' team bracket needs ' + str(int(math.log2(size))) + ' round dates.')
+
+    # Lay out every match of every round in tournament number order
+    slots = {}
+    tourney_number = 1
+    round_size = size // 2
+    for round_date in round_dates:
+        for slot in range(round_size):
+            slots[tourney_number] = Match(match_date=round_date, tourney_match=True, tourney_number=tourney_number, bracket_number=bracket_number)
+            tourney_number += 1
+        round_size //= 2
+
+    # Seat round 1 and move teams with a bye straight into round 2
+    seeds = {seed:team for seed, team in enumerate(teams, start=1)}
+    seed_order = get_seed_order(size)
+    ready_matches = []
+    round_two = {}
+    for number in range(1, size // 2 + 1):
+        match = slots[number]
+        match.home_team = seeds.get(seed_order[2 * number - 2])
+        match.away_team = seeds.get(seed_order[2 * number - 1])
+        if match.away_team is None:
+            match.complete = True
+            next_match = slots[get_next_tourney_number(number, size)]
+            if number % 2 == 1:
+                next_match.home_team = match.home_team
+            else:
+                next_match.away_team = match.home_team
+            round_two[next_match.tourney_number] = next_match
+        else:
+            ready_matches.append(match)
+
+    # Round 2 matches between two bye teams are ready to play straight away
+    for next_match in round_two.values():
+        if next_match.home_team is not None and next_match.away_team is not None:
+            seed_next_match(next_match)
+            ready_matches.append(next_match)
+
+    with transaction.atomic():
+        League_Team.objects.filter(pk__in=[team.pk for team in teams]).update(tournament_team=True, bracket_number=bracket_number)
+        matches = Match.objects.bulk_create(list(slots.values()))
+        Match_Survey.objects.bulk_create([survey for match in ready_matches for survey in get_tourney_surveys(match)])
+
+        # Bulk writes skip model signals, so clear the league cache explicitly
+        schema = connection.get_schema()
+        transaction.on_commit(lambda: invalidate_league_cache(schema))
+    return matches
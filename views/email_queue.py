@@ -0,0 +1,158 @@
+import datetime
+import json
+import os
+import time
+import uuid
+#Django modules
+from django.conf import settings
+from django.core.mail import BadHeaderError, EmailMessage, get_connection
+
+# Spool folders a message moves through on its way out
+QUEUED = 'queued'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+
+# Retry schedule for messages the mail server rejects or times out on
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+
+# A message claimed longer ago than this belongs to a worker that died, so it goes back in the queue
+SENDING_TIMEOUT_SECONDS = 15 * 60
+
+
+# Location of the outbound email spool (one JSON file per message)
+def get_queue_dir(status):
+    queue_dir = getattr(settings, 'EMAIL_QUEUE_DIR', os.path.join(settings.BASE_DIR, 'email_queue'))
+    status_dir = os.path.join(queue_dir, status)
+    os.makedirs(status_dir, exist_ok=True)
+    return status_dir
+
+
+# Write a message file atomically so a worker never reads a half written message
+def write_message(status, message_id, data):
+    path = os.path.join(get_queue_dir(status), message_id + '.json')
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as message_file:
+        json.dump(data, message_file)
+    os.replace(temp_path, path)
+    return path
+
+
+# Persist an email for the background worker instead of sending it inside the request
+def queue_email(subject, message, from_email, recipient_list):
+    if '\n' in subject or '\r' in subject:
+        raise BadHeaderError('Header values can\'t contain newlines (got %r)' % subject)
+
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    message_id = uuid.uuid4().hex
+    write_message(QUEUED, message_id, {
+        'id':message_id,
+        'subject':subject,
+        'message':message,
+        'from_email':from_email,
+        'recipient_list':list(recipient_list),
+        'status':QUEUED,
+        'attempts':0,
+        'created':now,
+        'next_attempt':now,
+        'error':'',
+    })
+    return message_id
+
+
+# Claim queued messages that are due by moving them into the sending folder
+def claim_messages(batch_size):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    queued_dir = get_queue_dir(QUEUED)
+    sending_dir = get_queue_dir(SENDING)
+
+    claimed = []
+    for file_name in sorted(os.listdir(queued_dir)):
+        if len(claimed) >= batch_size:
+            break
+        if not file_name.endswith('.json'):
+            continue
+        path = os.path.join(queued_dir, file_name)
+        sending_path = os.path.join(sending_dir, file_name)
+        # Renaming is atomic, so only one worker can claim each message, the other worker skips it
+        try:
+            with open(path) as message_file:
+                data = json.load(message_file)
+            if data['next_attempt'] > now:
+                continue
+            os.replace(path, sending_path)
+        except FileNotFoundError:
+            continue
+        # Renaming keeps the old modified time, stamp the claim time for release_stale_messages
+        os.utime(sending_path)
+        claimed.append(data)
+    return claimed
+
+
+# Put messages claimed by a worker that never finished back in the queue, returns how many were released
+def release_stale_messages(timeout=None):
+    queued_dir = get_queue_dir(QUEUED)
+    sending_dir = get_queue_dir(SENDING)
+    cutoff = time.time() - (SENDING_TIMEOUT_SECONDS if timeout is None else timeout)
+
+    released = 0
+    for file_name in os.listdir(sending_dir):
+        if not file_name.endswith('.json'):
+            continue
+        path = os.path.join(sending_dir, file_name)
+        try:
+            if os.path.getmtime(path) > cutoff:
+                continue
+            os.replace(path, os.path.join(queued_dir, file_name))
+        except FileNotFoundError:
+            continue
+        released += 1
+    return released
+
+
+# Send one batch of queued email over a single mail connection, returns (sent, retried, failed) counts
+def send_queued_email(batch_size=50):
+    release_stale_messages()
+    messages = claim_messages(batch_size)
+    if not messages:
+        return 0, 0, 0
+
+    sent = retried = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        connection = None
+        open_error = str(error)
+
+    for data in messages:
+        sending_path = os.path.join(get_queue_dir(SENDING), data['id'] + '.json')
+        now = datetime.datetime.now(datetime.timezone.utc)
+        data['attempts'] += 1
+        try:
+            if connection is None:
+                raise ConnectionError(open_error)
+            email = EmailMessage(data['subject'], data['message'], data['from_email'], data['recipient_list'], connection=connection)
+            email.send()
+        except Exception as error:
+            data['error'] = str(error)
+            if data['attempts'] >= MAX_ATTEMPTS:
+                data['status'] = FAILED
+                failed += 1
+            else:
+                # Back off exponentially before the next attempt
+                data['status'] = QUEUED
+                data['next_attempt'] = (now + datetime.timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (data['attempts'] - 1))).isoformat()
+                retried += 1
+        else:
+            data['status'] = SENT
+            data['sent'] = now.isoformat()
+            data['error'] = ''
+            sent += 1
+        write_message(data['status'], data['id'], data)
+        os.remove(sending_path)
+
+    if connection is not None:
+        connection.close()
+    return sent, retried, failed
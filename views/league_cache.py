@@ -0,0 +1,75 @@
+import uuid
+#Django modules
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+#Project models
+from esports.models import League_Game, League_Team, Match
+from esports.instrumentation import record_cache
+
+# Bounds how long a lock can be held
+REBUILD_LOCK_TIMEOUT = 30
+
+# Seconds a fragment (and its stale copy) is kept, copies for old versions and days expire on their own
+LEAGUE_FRAGMENT_TIMEOUT = 24 * 60 * 60
+
+
+# Current data version token for a tenant, replaced whenever its league data changes
+# Tokens are random so an evicted version key can never restart at a value old fragments were stored under
+def get_league_version(schema=None):
+    schema = schema or connection.get_schema()
+    version_key = 'league:' + schema + ':version'
+    version = cache.get(version_key)
+    if version is None:
+        token = uuid.uuid4().hex
+        cache.add(version_key, token, None)
+        version = cache.get(version_key) or token
+    return version
+
+
+# Return a cached league fragment, rebuilding it at most once per data version
+def get_league_fragment(name, builder):
+    schema = connection.get_schema()
+    version = get_league_version(schema)
+    fragment_key = 'league:' + schema + ':' + name + ':' + str(version)
+    stale_key = 'league:' + schema + ':' + name + ':stale'
+    lock_key = 'league:' + schema + ':' + name + ':lock'
+
+    fragment = cache.get(fragment_key)
+    record_cache(fragment is not None)
+    if fragment is not None:
+        return fragment
+
+    # Only the first request to miss rebuilds, the others get the last good copy while it runs
+    locked = cache.add(lock_key, version, REBUILD_LOCK_TIMEOUT)
+    if not locked:
+        fragment = cache.get(stale_key)
+        if fragment is not None:
+            return fragment
+
+    try:
+        fragment = builder()
+        cache.set_many({fragment_key:fragment, stale_key:fragment}, LEAGUE_FRAGMENT_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return fragment
+
+
+# Replace the tenant's data version so every league fragment is rebuilt on next use
+def invalidate_league_cache(schema=None):
+    schema = schema or connection.get_schema()
+    cache.set('league:' + schema + ':version', uuid.uuid4().hex, None)
+
+
+# Invalidate once the surrounding transaction commits so readers never cache uncommitted data
+@receiver(post_save, sender=League_Game)
+@receiver(post_save, sender=League_Team)
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=League_Game)
+@receiver(post_delete, sender=League_Team)
+@receiver(post_delete, sender=Match)
+def league_data_changed(sender, **kwargs):
+    schema = connection.get_schema()
+    transaction.on_commit(lambda: invalidate_league_cache(schema))
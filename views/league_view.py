@@ -2,50 +2,125 @@ import datetime
 from datetime import timedelta
 import math
 #Django modules
-from django.shortcuts import render
-from django.http import HttpResponse
-from django.core.mail import BadHeaderError, send_mail
-from django.db.models import Q
-from django.db import connection
+from django.http import Http404, HttpResponse, JsonResponse
+from django.core.mail import BadHeaderError
+from django.db.models import F, Q
+from django.db import connection, transaction
+from django.views.decorators.cache import cache_control
 from django.views.decorators.clickjacking import xframe_options_exempt
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
 #Project models
-from esports.models import League_Game, League_Team, Match, Match_Survey,Org_League
+from esports.models import League_Game, League_Team, Match, Match_Survey
+from esports.views.brackets import (
+    build_bracket_leagues, get_bracket_matches_size, get_next_tourney_number, get_tourney_surveys, seat_winner, seed_next_match,
+)
+from esports.views.standings import build_standings
+from esports.views.upcoming import build_upcoming
+from esports.views.league_cache import LEAGUE_FRAGMENT_TIMEOUT, get_league_fragment, get_league_version
+from esports.views.email_queue import queue_email
+from esports.views.tenant import get_org
+from esports.views.roles import COMPETITIONS_MANAGER_GROUP, in_group, is_site_manager
+from esports.views.snapshots import snapshot_page
+from esports.live_results import get_result_delta, publish_result
+from esports.instrumentation import timed_render
 
 # Render login page
 def login(request):
-    return render(request, 'esports/login.html')
+    return timed_render(request, 'esports/login.html')
 
 # Render the home page with league overview and recent matches
+@snapshot_page
 def index(request):
     # If user is a site manage show admin dashboard button
-    is_admin = request.user.groups.filter(name='#####').exists()
-    subdomain = request.META.get('HTTP_HOST').split('.')[0]  # Get subdomain from request
+    is_admin = is_site_manager(request)
     schema = connection.get_schema()
-    if subdomain == 'public' or subdomain == '127': # For testing
-        subdomain = 'gse' # Default schema
-    org = Org_League.objects.get(org_schema=subdomain)  # Get organization data
+    org = get_org(request)  # Get organization data (cached per tenant)
   
     context = {
         'is_admin':is_admin,
         'schema':schema,
         'org':org,
     }
-    return render(request, 'esports/index.html', context)
+    return timed_render(request, 'esports/index.html', context)
 
 
 # Render public-facing match ticker (allows embedding in iframes)
 @xframe_options_exempt # Allows view to be displayed in iframe - for use on other websites
+@snapshot_page
 def ticker(request):
-    # Get league games and recent match data
-    active_league_games, last_week_matches, img_path = get_recent_match_data()
+    # Get league games and recent match data, cached until a match or league changes (or the day rolls over)
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    active_league_games, last_week_matches, img_path = get_league_fragment('ticker:' + str(today), get_ticker_data)
     
     context = {
         'active_league_games':active_league_games,
         'last_week_matches':last_week_matches,
         'img_path':img_path,
     }
-    return render(request, 'esports/ticker.html',context)
+    return timed_render(request, 'esports/ticker.html',context)
+
+
+# Embeddable ticker shell, it holds no match data so browsers can keep it while polling ticker_feed
+@xframe_options_exempt
+@cache_control(public=True, max_age=3600)
+def ticker_embed(request):
+    return timed_render(request, 'esports/ticker_embed.html')
+
+
+# Version tag for the ticker feed, changes whenever league data changes or the day rolls over
+def get_ticker_etag(request):
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return connection.get_schema() + '-' + str(get_league_version()) + '-' + str(today)
+
+
+# Compact JSON ticker feed for embedded tickers, answers 304 Not Modified when nothing changed
+@xframe_options_exempt
+@condition(etag_func=get_ticker_etag)
+def ticker_feed(request):
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    matches = get_league_fragment('ticker_feed:' + str(today), get_ticker_feed_data)
+    response = JsonResponse({'version':get_ticker_etag(request), 'matches':matches})
+    # Let browsers keep the feed but always revalidate it with the ETag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+# Last week's matches with only the columns the ticker shows, in a single query
+def get_ticker_feed_data():
+    active_league_games, last_week_matches, img_path = get_recent_match_data()
+    last_week_matches = last_week_matches.order_by('match_date__match_date', 'pk').values(
+        'pk',
+        'complete',
+        'home_score',
+        'away_score',
+        'match_date__match_date',
+        'match_date__league_game__league_season_name',
+        'home_team__school_team__school__school_name',
+        'away_team__school_team__school__school_name',
+    )
+    return [
+        {
+            'id':match['pk'],
+            'date':match['match_date__match_date'].isoformat(),
+            'league':match['match_date__league_game__league_season_name'],
+            'home':match['home_team__school_team__school__school_name'],
+            'away':match['away_team__school_team__school__school_name'],
+            'home_score':match['home_score'],
+            'away_score':match['away_score'],
+            'complete':match['complete'],
+        }
+        for match in last_week_matches
+    ]
+
+
+# Evaluate recent match data so it can be stored in the league cache
+def get_ticker_data():
+    active_league_games, last_week_matches, img_path = get_recent_match_data()
+    last_week_matches = last_week_matches.select_related(
+        'home_team__school_team__school',
+        'away_team__school_team__school',
+    )
+    return list(active_league_games), list(last_week_matches), img_path
 
 
 # Retrieve active league games and recent matches
@@ -79,7 +154,7 @@ def get_recent_match_data():
 # Custom 404 error handler
 def handler404(request, exception):
     context = {}
-    response = render(request, "errors/404.html", context=context)
+    response = timed_render(request, "errors/404.html", context=context)
     response.status_code = 404
     return response
 
@@ -87,62 +162,148 @@ def handler404(request, exception):
 # Custom 500 error handler
 def handler500(request):
     context = {}
-    response = render(request, "errors/500.html", context=context)
+    response = timed_render(request, "errors/500.html", context=context)
     response.status_code = 500
     return response
 
 
-# View for showing upcoming competitions (cached for 5 seconds)
-@cache_page(5)
+# View for showing upcoming competitions (standings and brackets cached until league data changes)
+@snapshot_page
 def competitions(request):
     # If user is a site manage show admin dashboard button
-    is_admin = request.user.groups.filter(name='######').exists()
+    is_admin = in_group(request, COMPETITIONS_MANAGER_GROUP)
 
     # Find all active games for displaying teams and standings
-    active_matches = Match.objects.filter(match_date__league_game__activate = True)
-    active_league_games = League_Game.objects.filter(activate = True).order_by('start_date')
-    contenders_games = active_league_games.filter(league_level__level_of_play="Contenders")
-    active_league_games = active_league_games.filter(league_level__level_of_play="Champion")
+    active_league_games, contenders_games = get_competition_league_games()
 
-    # Get date range for upcoming matches
+    # Group the week's matches by league, date and conference in one query
     now = datetime.datetime.now(datetime.timezone.utc)
-    enddate = now + timedelta(days=6)
-
-    # Filter upcoming week matches
-    upcoming_week_matches = active_matches.filter(match_date__match_date__range=[now.date(),enddate.date()])
-    upcoming_week_matches = upcoming_week_matches.exclude(home_team__school_team=None)
-    upcoming_week_matches = upcoming_week_matches.exclude(away_team__school_team=None)
-    upcoming_week_matches = upcoming_week_matches.exclude(~Q(away_team__bye_week_name="None"))
-    upcoming_week_matches = upcoming_week_matches.exclude(~Q(home_team__bye_week_name="None"))
+    champion_upcoming, contenders_upcoming = get_competition_upcoming(now, active_league_games, contenders_games)
     
     img_path = 'media'
 
-    # If tournament brackets are active, load and show brackets
-    active_tourneys = active_league_games.filter(show_bracket=True)
-    num_active = len(active_tourneys)
+    # Build conference standings for every active league in one query
+    champion_standings, contenders_standings = get_competition_standings(active_league_games, contenders_games)
+
+    # If tournament brackets are active, build each league's bracket tree once
+    bracket_leagues = get_league_fragment('brackets', lambda: build_bracket_leagues(active_league_games))
+    num_active = len(bracket_leagues)
+
+    # Key for the shared page body, the user-specific nav is rendered around it
+    schema = connection.get_schema()
+    league_version = get_league_version(schema)
 
     context = {
         'is_admin':is_admin,
+        'schema':schema,
+        'league_version':league_version,
+        'body_cache_timeout':LEAGUE_FRAGMENT_TIMEOUT,
+        'today':now.date(),
         'active_league_games':active_league_games,
         'contenders_games':contenders_games,
-        'upcoming_week_matches':upcoming_week_matches,
+        'champion_upcoming':champion_upcoming,
+        'contenders_upcoming':contenders_upcoming,
         'img_path':img_path,
         'num_active':num_active,
+        'bracket_leagues':bracket_leagues,
+        'champion_standings':champion_standings,
+        'contenders_standings':contenders_standings,
     }
-    return render(request, 'esports/competitions.html', context)
+    return timed_render(request, 'esports/competitions.html', context)
+
+
+# Active Champion and Contenders league games, in display order
+def get_competition_league_games():
+    league_games = League_Game.objects.filter(activate = True).select_related('league_level').order_by('start_date')
+    contenders_games = league_games.filter(league_level__level_of_play="Contenders")
+    active_league_games = league_games.filter(league_level__level_of_play="Champion")
+    return active_league_games, contenders_games
+
+
+# Active league matches from today through the next six days, excluding matches missing teams or bye weeks
+def get_upcoming_week_matches(now):
+    enddate = now + timedelta(days=6)
+    active_matches = Match.objects.filter(match_date__league_game__activate = True)
+    upcoming_week_matches = active_matches.filter(match_date__match_date__range=[now.date(),enddate.date()])
+    upcoming_week_matches = upcoming_week_matches.exclude(home_team__school_team=None)
+    upcoming_week_matches = upcoming_week_matches.exclude(away_team__school_team=None)
+    upcoming_week_matches = upcoming_week_matches.exclude(~Q(away_team__bye_week_name="None"))
+    upcoming_week_matches = upcoming_week_matches.exclude(~Q(home_team__bye_week_name="None"))
+    return upcoming_week_matches
+
+
+# Cached Champion and Contenders matches from today through the next six days
+def get_competition_upcoming(now, active_league_games, contenders_games):
+    return get_league_fragment(
+        'upcoming:' + str(now.date()),
+        lambda: build_upcoming(get_upcoming_week_matches(now), active_league_games, contenders_games),
+    )
+
+
+# Cached Champion and Contenders conference standings
+def get_competition_standings(active_league_games, contenders_games):
+    return get_league_fragment('standings', lambda: build_standings(active_league_games, contenders_games))
+
+
+# Partial template for each competitions section, a league's tab is rendered on its own when first opened
+COMPETITION_SECTIONS = {
+    'brackets':'esports/competitions_bracket.html',
+    'standings':'esports/competitions_standings.html',
+    'upcoming':'esports/competitions_upcoming.html',
+}
+
+
+# Find one league's entry in a list of precomputed {'league': ...} sections
+def get_league_entry(entries, league_id):
+    for entry in entries:
+        if entry['league'].id == league_id:
+            return entry
+    raise Http404('League not found.')
+
+
+# Version tag for one competitions tab, changes whenever league data changes or the day rolls over
+def get_competitions_fragment_etag(request, section, league_id):
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return connection.get_schema() + '-' + str(get_league_version()) + '-' + section + '-' + str(league_id) + '-' + str(today)
+
+
+# Render one league's tab of a competitions section, fetched by the page when the tab is opened
+@condition(etag_func=get_competitions_fragment_etag)
+def competitions_fragment(request, section, league_id):
+    if section not in COMPETITION_SECTIONS:
+        raise Http404('Unknown section.')
+    active_league_games, contenders_games = get_competition_league_games()
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    context = {'img_path':'media'}
+    if section == 'brackets':
+        bracket_leagues = get_league_fragment('brackets', lambda: build_bracket_leagues(active_league_games))
+        context['bracket_league'] = get_league_entry(bracket_leagues, league_id)
+        context['league'] = context['bracket_league']['league']
+    elif section == 'standings':
+        champion_standings, contenders_standings = get_competition_standings(active_league_games, contenders_games)
+        context['standing'] = get_league_entry(champion_standings + contenders_standings, league_id)
+        context['league'] = context['standing']['league']
+    else:
+        champion_upcoming, contenders_upcoming = get_competition_upcoming(now, active_league_games, contenders_games)
+        context['upcoming'] = get_league_entry(champion_upcoming + contenders_upcoming, league_id)
+        context['league'] = context['upcoming']['league']
+
+    response = timed_render(request, COMPETITION_SECTIONS[section], context)
+    # Let browsers keep the tab but always revalidate it with the ETag
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
 # Render privacy policy page
+@snapshot_page
 def privacy_policy(request):
     # If user is a site manage show admin dashboard button
-    is_admin = request.user.groups.filter(name='#####').exists()
+    is_admin = is_site_manager(request)
 
-    # Get subdomain from request
-    subdomain = request.META.get('HTTP_HOST').split('.')[0]
+    # Get organization for the request's subdomain
     schema = connection.get_schema()
-    if subdomain == 'public' or subdomain == '127': # For testing
-        subdomain = 'gse'
-    org = Org_League.objects.get(org_schema=subdomain)
+    org = get_org(request)
     img_path = 'media'
 
     context = {
@@ -151,21 +312,18 @@ def privacy_policy(request):
         'schema':schema,
         'org':org,
     }
-    return render(request, 'esports/privacy_policy.html', context)
+    return timed_render(request, 'esports/privacy_policy.html', context)
 
 
-# Send a welcome email to a coach
+# Queue a welcome email to a coach (delivered by the send_queued_email worker)
 def send_email(request, coach_email):
-    subdomain = request.META.get('HTTP_HOST').split('.')[0]
-    if subdomain == 'public':
-        subdomain = 'gse'
-    org = Org_League.objects.get(org_schema=subdomain)
+    org = get_org(request)
     subject = 'Join ' + org.org_schema.upper() + ' Portal'
     message = 'Welcome to the '  + org.org_schema.upper() +' Family!\n\nYour email address, '+coach_email +', has been approved for GSE Portal account creation! The GSE Portal is your go-to hub for all GSE competition resources, including season registration, team and roster management, and access to season schedules.\n\nGet Started in 3 Easy Steps:\n\nLog In: Visit https://'+ org.org_schema +'.esportsforedu.com/login/ using your approved email address through Google or Microsoft Single Sign-On.\n\nAdd Your Discord ID: You\'ll be prompted to provide your Discord ID. Please have this information ready, as it\'s a required step to proceed. If you haven\'t joined the GSE Discord, you\'ll want to do that before creating your account. Reach out to chris@gsepsorts.org if you haven\'t been invited to the GSE Discord.\n\nWatch the Demo: We\'ve put together a short demonstration video of the GSE Portal to help you get started. Check it out here!\nhttps://drive.google.com/file/d/16crA15OUVPpQS_5OINE9DKc_SezzM8bJ/view?usp=sharing\n\nNeed Help Finding Your Discord User ID?\n\nA Discord user ID is an 18- or 19-digit number that differs from your username. Follow these steps to find it:\n\nOpen the Discord app or website. Click the Settings icon in the lower-left corner. Go to Advanced options and enable Developer Mode. Exit Settings, click your username, and then click it again to copy your Discord user ID. You can now paste your ID number into the GSE portal when creating your account.\n\nIf you need any help reach out to jim@gsesports.org or regina@gsesports.org and they\'ll help you get your account created! '
     from_email = org.org_email
     if subject and message and from_email:
         try:
-            send_mail(subject, message, from_email, [coach_email])
+            queue_email(subject, message, from_email, [coach_email])
         except BadHeaderError:
             return HttpResponse('Invalid header found.')
     else:
@@ -177,9 +335,62 @@ def calculate_points(wins,losses,ties,forfeits):
     return wins*3+ties
 
 
+# Match columns written when a match result is submitted
+MATCH_RESULT_FIELDS = [
+    'home_score', 'away_score', 'home_forfeit', 'away_forfeit',
+    'home_awaysportsmanship', 'away_homesportsmanship', 'home_awayontime', 'away_homeontime',
+    'home_pog', 'home_away_pog', 'away_pog', 'away_home_pog',
+    'home_roster_correct', 'away_roster_correct', 'home_scouting_correct', 'away_scouting_correct',
+    'home_roster', 'away_roster', 'complete',
+]
+
+# League team counters changed by a match result
+TEAM_RECORD_FIELDS = ['wins', 'losses', 'ties', 'forfeits', 'score_for', 'score_against']
+
+
 # Update match and team records after score submission
 def submit_scores(match, home_report, away_report):
-     # Copy match report data to match object
+    # Match completion, team records, report cleanup and bracket advancement commit together
+    with transaction.atomic():
+        # Lock the match, then both teams in primary key order so concurrent submissions can't deadlock
+        # Work from the locked row, the caller's copy may predate a bracket seeding swap
+        match = Match.objects.select_for_update(of=('self',)).select_related('match_date__league_game__league_level').get(pk=match.pk)
+        # Another submission already finished this match while we waited for the lock, its reports are spent
+        if match.complete:
+            home_report.delete()
+            away_report.delete()
+            return None
+        teams = League_Team.objects.select_for_update().filter(pk__in=[match.home_team_id, match.away_team_id]).order_by('pk')
+        teams = {team.pk:team for team in teams}
+        home_team = teams[match.home_team_id]
+        away_team = teams[match.away_team_id]
+
+        # Copy match report data to match object
+        apply_match_reports(match, home_report, away_report)
+
+        # Save match as complete and update team records
+        match.complete = True
+        match.save(update_fields=MATCH_RESULT_FIELDS)
+
+        # Update win/loss/tie/forfeit stats with database-side increments
+        home_delta, away_delta = get_team_deltas(match)
+        update_team_record(home_team, home_delta)
+        update_team_record(away_team, away_delta)
+
+        # Delete the reports after use
+        home_report.delete()
+        away_report.delete()
+
+        # Handle tournament bracket progression
+        next_match = advance_bracket(match, home_team, away_team)
+
+        # Push the result to live pages after the transaction commits
+        publish_result(home_team.league_game_id, get_result_delta(match, [home_team, away_team], next_match))
+
+
+# Copy both teams' survey reports onto the match and settle forfeit scores
+def apply_match_reports(match, home_report, away_report):
+    league_game = match.match_date.league_game
     match.home_score = home_report.team_score
     match.away_score = home_report.other_score
     match.home_forfeit = home_report.team_forfeit
@@ -192,10 +403,10 @@ def submit_scores(match, home_report, away_report):
     match.home_away_pog = home_report.other_pog
     match.away_pog = away_report.team_pog
     match.away_home_pog = away_report.other_pog
-    match.home_roster_correct = True if away_report.roster_correct == "Yes" or match.match_date.league_game.league_level.level_of_play != "Champion" else False
-    match.away_roster_correct = True if home_report.roster_correct == "Yes" or match.match_date.league_game.league_level.level_of_play != "Champion" else False
-    match.home_scouting_correct = True if away_report.scouting_correct == "Yes" or match.match_date.league_game.scouting_required == False else False
-    match.away_scouting_correct = True if home_report.scouting_correct == "Yes" or match.match_date.league_game.scouting_required == False else False
+    match.home_roster_correct = True if away_report.roster_correct == "Yes" or league_game.league_level.level_of_play != "Champion" else False
+    match.away_roster_correct = True if home_report.roster_correct == "Yes" or league_game.league_level.level_of_play != "Champion" else False
+    match.home_scouting_correct = True if away_report.scouting_correct == "Yes" or league_game.scouting_required == False else False
+    match.away_scouting_correct = True if home_report.scouting_correct == "Yes" or league_game.scouting_required == False else False
     match.home_roster = home_report.team_roster
     match.away_roster = away_report.team_roster
     if match.home_forfeit and match.away_forfeit:
@@ -212,83 +423,71 @@ def submit_scores(match, home_report, away_report):
         else:
             match.away_score = math.floor(match.home_team.league_game.series_length/2) + 1
 
-    # Save match as complete and update team records
-    match.complete = True
-    match.save()
 
-    # Update win/loss/tie/forfeit stats
-    home_team = match.home_team
-    away_team = match.away_team
+# Work out how a completed match changes each team's record
+def get_team_deltas(match):
+    home_delta = dict.fromkeys(TEAM_RECORD_FIELDS, 0)
+    away_delta = dict.fromkeys(TEAM_RECORD_FIELDS, 0)
     if match.home_forfeit and match.away_forfeit:
-        home_team.forfeits = home_team.forfeits + 1
-        away_team.forfeits = away_team.forfeits + 1
-        home_team.losses = home_team.losses + 1
-        away_team.losses = away_team.losses + 1
+        home_delta['forfeits'] += 1
+        away_delta['forfeits'] += 1
+        home_delta['losses'] += 1
+        away_delta['losses'] += 1
     elif match.home_forfeit:
-        home_team.forfeits = home_team.forfeits + 1
-        away_team.wins = away_team.wins + 1
-        home_team.losses = home_team.losses + 1
+        home_delta['forfeits'] += 1
+        away_delta['wins'] += 1
+        home_delta['losses'] += 1
     elif match.away_forfeit:
-        away_team.forfeits = away_team.forfeits + 1
-        home_team.wins = home_team.wins + 1
-        away_team.losses = away_team.losses + 1
+        away_delta['forfeits'] += 1
+        home_delta['wins'] += 1
+        away_delta['losses'] += 1
     elif int(match.home_score) > int(match.away_score):
-        home_team.wins = home_team.wins + 1
-        away_team.losses = away_team.losses + 1
+        home_delta['wins'] += 1
+        away_delta['losses'] += 1
     elif int(match.home_score) < int(match.away_score):
-        home_team.losses = home_team.losses + 1
-        away_team.wins = away_team.wins + 1
+        home_delta['losses'] += 1
+        away_delta['wins'] += 1
     elif int(match.home_score) == int(match.away_score):
-        home_team.ties = home_team.ties + 1
-        away_team.ties = away_team.ties + 1
-    home_team.score_for = home_team.score_for + int(match.home_score)
-    home_team.score_against = home_team.score_against + int(match.away_score)
-    away_team.score_for = away_team.score_for + int(match.away_score)
-    away_team.score_against = away_team.score_against + int(match.home_score)
-    
-    # Save new point totals
-    home_team.points = calculate_points(home_team.wins,home_team.losses,home_team.ties,home_team.forfeits)
-    away_team.points = calculate_points(away_team.wins,away_team.losses,away_team.ties,away_team.forfeits)
-    home_team.save()
-    away_team.save()
-
-    # Delete the reports after use
-    home_report.delete()
-    away_report.delete()
-
-    # Handle tournament bracket progression
+        home_delta['ties'] += 1
+        away_delta['ties'] += 1
+    home_delta['score_for'] += int(match.home_score)
+    home_delta['score_against'] += int(match.away_score)
+    away_delta['score_for'] += int(match.away_score)
+    away_delta['score_against'] += int(match.home_score)
+    return home_delta, away_delta
+
+
+# Increment a team's record in the database and mirror the new totals on the locked instance
+def update_team_record(team, delta):
+    totals = {field:F(field) + delta[field] for field in TEAM_RECORD_FIELDS}
+    totals['points'] = calculate_points(totals['wins'], totals['losses'], totals['ties'], totals['forfeits'])
+    League_Team.objects.filter(pk=team.pk).update(**totals)
+
+    for field in TEAM_RECORD_FIELDS:
+        setattr(team, field, getattr(team, field) + delta[field])
+    team.points = calculate_points(team.wins, team.losses, team.ties, team.forfeits)
+
+
+# Move the winner of a tournament match into its slot in the next round, returns the filled match
+def advance_bracket(match, home_team, away_team):
+    if not match.tourney_match:
+        return None
     bracket = match.bracket_number
     tourney_matches = Match.objects.filter(match_date__league_game=home_team.league_game)
     tourney_matches = tourney_matches.filter(tourney_match=True)
     tourney_matches = tourney_matches.filter(bracket_number=bracket)
-    if len(tourney_matches) > 0:
-        league_teams = League_Team.objects.filter(league_game=home_team.league_game)
-        tourney_teams = league_teams.filter(tournament_team=True)
-        tourney_teams = tourney_teams.filter(bracket_number=home_team.bracket_number)
-        team_count=len(tourney_teams)
-        round1_count = team_count/2
-        tourn_num = math.ceil(match.tourney_number/2)
-        next_match_num = int(round1_count + tourn_num)
-        if next_match_num <= team_count - 1:
-            next_match = tourney_matches.get(tourney_number=next_match_num)
-            if match.tourney_number%2==1:
-                if match.home_score > match.away_score:
-                    next_match.home_team=home_team
-                else:
-                    next_match.home_team=away_team
-            else:
-                if match.home_score > match.away_score:
-                    next_match.away_team=home_team
-                else:
-                    next_match.away_team=away_team
-            next_match.save()
+
+    # Bracket numbering fixes every match's next slot, so only the bracket size is needed
+    bracket_size = get_bracket_matches_size(tourney_matches)
+    if bracket_size:
+        next_match_num = get_next_tourney_number(match.tourney_number, bracket_size)
+        if next_match_num is not None:
+            # Lock the next match so both feeder results see each other's slot
+            next_match = tourney_matches.select_for_update().get(tourney_number=next_match_num)
+            next_match.save(update_fields=[seat_winner(match, next_match, home_team, away_team)])
             if next_match.home_team != None and next_match.away_team != None:
-                if next_match.home_team.seeding > next_match.away_team.seeding:
-                    temp = next_match.home_team
-                    next_match.home_team = next_match.away_team
-                    next_match.away_team = temp
-                    next_match.save()
-                home_survey = Match_Survey(match=next_match, team = next_match.home_team, other_team = next_match.away_team, team_score = 0, other_score=0,team_forfeit=False,other_forfeit=False,team_pog=None,other_pog=None,complete=False,tourney_survey=True)
-                away_survey = Match_Survey(match=next_match, team = next_match.away_team, other_team = next_match.home_team, team_score = 0, other_score=0,team_forfeit=False,other_forfeit=False,team_pog=None,other_pog=None,complete=False,tourney_survey=True)
-                home_survey.save()
-                away_survey.save()
+                if seed_next_match(next_match):
+                    next_match.save(update_fields=['home_team', 'away_team'])
+                Match_Survey.objects.bulk_create(get_tourney_surveys(next_match))
+            return next_match
+    return None
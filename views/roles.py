@@ -0,0 +1,84 @@
+#Django modules
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from django_tenants.utils import get_public_schema_name
+
+# Group whose members see the admin dashboard button
+SITE_MANAGER_GROUP = '#####'
+
+# Group the competitions page checks for its dashboard button (it has always differed from SITE_MANAGER_GROUP)
+COMPETITIONS_MANAGER_GROUP = '######'
+
+
+# Names of the groups the request's user belongs to, loaded once per request and kept in the session
+def get_user_groups(request):
+    if hasattr(request, '_user_groups'):
+        return request._user_groups
+
+    user = request.user
+    if not user.is_authenticated:
+        request._user_groups = frozenset()
+        return request._user_groups
+
+    # The session copy is trusted until the user's group membership version changes
+    version_key = 'user_groups:' + str(user.pk) + ':version'
+    cache.add(version_key, 1, None)
+    version = cache.get(version_key, 1)
+    session_groups = request.session.get('user_groups')
+    if session_groups is None or session_groups['version'] != version or session_groups['user'] != user.pk:
+        session_groups = {
+            'user':user.pk,
+            'version':version,
+            'groups':list(user.groups.values_list('name', flat=True)),
+        }
+        request.session['user_groups'] = session_groups
+
+    request._user_groups = frozenset(session_groups['groups'])
+    return request._user_groups
+
+
+# True if the request's user belongs to the named group
+def in_group(request, group_name):
+    return group_name in get_user_groups(request)
+
+
+# True if the request's user is a site manager
+def is_site_manager(request):
+    return in_group(request, SITE_MANAGER_GROUP)
+
+
+# True if the request's user can see every organization's data: a superuser, or a site manager of the
+# state office's public schema (an organization's own site managers only see their organization)
+def is_state_office(request):
+    if request.user.is_superuser:
+        return True
+    return connection.get_schema() == get_public_schema_name() and is_site_manager(request)
+
+
+# Template context processor exposing the user's roles
+def user_roles(request):
+    return {
+        'is_admin':is_site_manager(request),
+        'user_groups':get_user_groups(request),
+    }
+
+
+# Invalidate stored group lists when a user's group membership changes
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    # Changes made from the group side list the affected users in pk_set
+    if reverse:
+        user_ids = pk_set or instance.user_set.values_list('pk', flat=True)
+    else:
+        user_ids = [instance.pk]
+    for user_id in user_ids:
+        version_key = 'user_groups:' + str(user_id) + ':version'
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            cache.set(version_key, 2, None)
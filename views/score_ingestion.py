@@ -0,0 +1,133 @@
+from collections import Counter, defaultdict
+#Django modules
+from django.db import connection, transaction
+from django.db.models import Q
+#Project models
+from esports.models import League_Team, Match, Match_Survey
+from esports.live_results import get_result_delta, publish_result
+from esports.views.league_cache import invalidate_league_cache
+from esports.views.brackets import get_next_tourney_number, get_tourney_surveys, seat_winner, seed_next_match
+from esports.views.league_view import MATCH_RESULT_FIELDS, TEAM_RECORD_FIELDS, apply_match_reports, calculate_points, get_team_deltas
+
+
+# Finalize every match in a league game that has both team reports, returns one result per match
+def submit_league_scores(league_game):
+    with transaction.atomic():
+        # Lock every match this batch can write (the reported matches and the league's tournament matches)
+        # in one primary key ordered statement before any team, matching submit_scores' match-then-teams order
+        reported_ids = set(Match_Survey.objects.filter(
+            match__match_date__league_game=league_game,
+            match__complete=False,
+            complete=True,
+        ).values_list('match_id', flat=True))
+        locked_matches = Match.objects.select_for_update(of=('self',)).filter(
+            Q(pk__in=reported_ids) | Q(match_date__league_game=league_game, tourney_match=True)
+        ).select_related('home_team', 'away_team').order_by('pk')
+        locked_matches = list(locked_matches)
+        # Matches finished by submit_scores while we waited for the locks drop out here
+        match_ids = [match.pk for match in locked_matches if match.pk in reported_ids and not match.complete]
+
+        # Load the completed reports for the locked matches with the rows submit_scores walks through
+        reports = Match_Survey.objects.filter(
+            match_id__in=match_ids,
+            complete=True,
+        ).select_related(
+            'match__match_date__league_game__league_level',
+            'match__home_team__league_game',
+            'match__away_team__league_game',
+        ).order_by('match__tourney_number', 'match_id')
+
+        # Pair the home and away reports for each match
+        matches = {}
+        match_reports = defaultdict(dict)
+        for report in reports:
+            matches[report.match_id] = report.match
+            match_reports[report.match_id][report.team_id] = report
+
+        # Lock every team involved once, in primary key order
+        team_ids = set()
+        for match in matches.values():
+            team_ids.update([match.home_team_id, match.away_team_id])
+        teams = League_Team.objects.select_for_update().filter(pk__in=team_ids).order_by('pk')
+        teams = {team.pk:team for team in teams}
+
+        # Tournament brackets for advancement, already locked above
+        # Only the match rows are locked, the team joins are nullable (TBD slots and byes)
+        tourney_slots = {(match.bracket_number, match.tourney_number):match for match in locked_matches if match.tourney_match}
+        bracket_sizes = {}
+        for (bracket_number, tourney_number) in tourney_slots:
+            bracket_sizes[bracket_number] = max(bracket_sizes.get(bracket_number, 0), tourney_number + 1)
+
+        results = []
+        completed = []
+        used_reports = []
+        filled_matches = {}
+        team_deltas = defaultdict(Counter)
+        for match_id, match in matches.items():
+            home_report = match_reports[match_id].get(match.home_team_id)
+            away_report = match_reports[match_id].get(match.away_team_id)
+            if home_report is None or away_report is None:
+                results.append({'match':match, 'complete':False, 'error':'Waiting for both team reports.'})
+                continue
+
+            # Compute the result in memory
+            apply_match_reports(match, home_report, away_report)
+            match.complete = True
+            completed.append(match)
+            used_reports.extend([home_report, away_report])
+            home_delta, away_delta = get_team_deltas(match)
+            team_deltas[match.home_team_id].update(home_delta)
+            team_deltas[match.away_team_id].update(away_delta)
+
+            # Seat tournament winners in their next match
+            next_match = None
+            if match.tourney_match and match.bracket_number in bracket_sizes:
+                next_match_num = get_next_tourney_number(match.tourney_number, bracket_sizes[match.bracket_number])
+                next_match = tourney_slots.get((match.bracket_number, next_match_num))
+                if next_match is not None:
+                    seat_winner(match, next_match, teams[match.home_team_id], teams[match.away_team_id])
+                    filled_matches[next_match.pk] = next_match
+
+            results.append({
+                'match':match,
+                'complete':True,
+                'home_score':match.home_score,
+                'away_score':match.away_score,
+                'next_match':next_match,
+            })
+
+        # Apply the summed record changes to the locked teams
+        changed_teams = []
+        for team_id, delta in team_deltas.items():
+            team = teams[team_id]
+            for field in TEAM_RECORD_FIELDS:
+                setattr(team, field, getattr(team, field) + delta[field])
+            team.points = calculate_points(team.wins, team.losses, team.ties, team.forfeits)
+            changed_teams.append(team)
+
+        # Seed newly completed pairings and open their tournament surveys
+        new_surveys = []
+        for next_match in filled_matches.values():
+            if next_match.home_team is not None and next_match.away_team is not None:
+                seed_next_match(next_match)
+                new_surveys.extend(get_tourney_surveys(next_match))
+
+        # Write everything back in a handful of bulk statements
+        Match.objects.bulk_update(completed, MATCH_RESULT_FIELDS)
+        League_Team.objects.bulk_update(changed_teams, TEAM_RECORD_FIELDS + ['points'])
+        Match.objects.bulk_update(list(filled_matches.values()), ['home_team', 'away_team'])
+        Match_Survey.objects.filter(pk__in=[report.pk for report in used_reports]).delete()
+        Match_Survey.objects.bulk_create(new_surveys)
+
+        # Bulk writes skip model signals, so clear the league cache explicitly
+        schema = connection.get_schema()
+        transaction.on_commit(lambda: invalidate_league_cache(schema))
+
+        # Push each result to live pages after the transaction commits
+        for result in results:
+            if result['complete']:
+                match = result['match']
+                result_teams = [teams[match.home_team_id], teams[match.away_team_id]]
+                publish_result(league_game.pk, get_result_delta(match, result_teams, result['next_match']))
+
+    return results
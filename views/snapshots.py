@@ -0,0 +1,175 @@
+import datetime
+import functools
+import gzip
+import logging
+import time
+#Django modules
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils.cache import patch_vary_headers
+from django_tenants.utils import get_public_schema_name, get_tenant_model, tenant_context
+#Project models
+from esports.models import Org_League
+from esports.views.league_cache import get_league_version
+from esports.views.tenant import get_host_org_schema, get_org_schema
+from esports.instrumentation import record_cache
+
+logger = logging.getLogger('esports.snapshots')
+
+# Public pages kept as snapshots for anonymous visitors, by url name
+SNAPSHOT_PAGES = ('index', 'competitions', 'ticker', 'privacy_policy')
+
+# Seconds a snapshot is served before it is regenerated even if league data hasn't changed
+SNAPSHOT_MAX_AGE = 15 * 60
+
+# Bounds how long one request can hold a page's regeneration lock
+SNAPSHOT_LOCK_TIMEOUT = 30
+
+# Seconds visitors are told to wait when a page has no snapshot yet and another request is rendering it
+SNAPSHOT_RETRY_AFTER = 5
+
+
+# Cache key for a page snapshot, keyed by the organization schema (as get_org_schema resolves it) so
+# org_snapshots_changed can find it from an Org_League row
+def get_snapshot_key(org_schema, path):
+    return 'snapshot:' + org_schema + ':' + path
+
+
+# True if the snapshot was rendered from the current league data, today, and recently enough
+def is_snapshot_fresh(snapshot, version):
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return (
+        snapshot['version'] == version
+        and snapshot['day'] == str(today)
+        and time.time() - snapshot['created'] < SNAPSHOT_MAX_AGE
+    )
+
+
+# Store a rendered page gzip-compressed, version is the league version read before rendering
+def store_snapshot(org_schema, path, version, response):
+    if response.status_code != 200 or response.streaming:
+        return None
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    snapshot = {
+        'version':version,
+        'day':str(today),
+        'created':time.time(),
+        'content_type':response['Content-Type'],
+        'body':gzip.compress(response.content),
+    }
+    cache.set(get_snapshot_key(org_schema, path), snapshot, None)
+    return snapshot
+
+
+# Serve a snapshot as stored when the browser accepts gzip, otherwise decompressed
+def get_snapshot_response(request, snapshot):
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        response = HttpResponse(snapshot['body'], content_type=snapshot['content_type'])
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(gzip.decompress(snapshot['body']), content_type=snapshot['content_type'])
+    patch_vary_headers(response, ('Accept-Encoding', 'Cookie'))
+    return response
+
+
+# Serve anonymous GET requests for a public page from its stored snapshot, rendering only when it is stale
+def snapshot_page(view):
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # Logged in users get their own nav buttons, so they always get a live render
+        if request.method != 'GET' or request.GET or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        version = get_league_version(connection.get_schema())
+        org_schema = get_org_schema(request)
+        snapshot_key = get_snapshot_key(org_schema, request.path)
+        snapshot = cache.get(snapshot_key)
+        fresh = snapshot is not None and is_snapshot_fresh(snapshot, version)
+        record_cache(fresh)
+        if fresh:
+            return get_snapshot_response(request, snapshot)
+
+        # Only the first request to find a stale snapshot re-renders, the others get the stale copy
+        lock_key = snapshot_key + ':lock'
+        locked = cache.add(lock_key, version, SNAPSHOT_LOCK_TIMEOUT)
+        if not locked:
+            if snapshot is not None:
+                return get_snapshot_response(request, snapshot)
+            # Cold start, ask the browser to retry rather than piling more renders onto the database
+            response = HttpResponse('This page is being prepared, please try again shortly.', status=503, content_type='text/plain')
+            response['Retry-After'] = str(SNAPSHOT_RETRY_AFTER)
+            return response
+
+        try:
+            response = view(request, *args, **kwargs)
+        except DatabaseError:
+            # Keep serving the last snapshot while the database is unavailable
+            if snapshot is None:
+                raise
+            return get_snapshot_response(request, snapshot)
+        finally:
+            cache.delete(lock_key)
+        store_snapshot(org_schema, request.path, version, response)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    # Undecorated view used by refresh_snapshots
+    wrapper.live_view = view
+    return wrapper
+
+
+# Render one tenant's public page as an anonymous visitor would see it
+def render_snapshot(tenant, domain, name):
+    path = reverse(name)
+    request = RequestFactory().get(path, HTTP_HOST=domain.domain)
+    request.user = AnonymousUser()
+    request.session = {}
+    request.tenant = tenant
+    return resolve(path).func.live_view(request)
+
+
+# Regenerate stale public page snapshots for every organization, returns the number of pages rendered
+def refresh_snapshots(force=False):
+    tenants = get_tenant_model().objects.exclude(schema_name=get_public_schema_name())
+    refreshed = 0
+    for tenant in tenants:
+        domain = tenant.get_primary_domain()
+        if domain is None:
+            logger.warning('Skipping snapshots for %s, it has no primary domain', tenant.schema_name)
+            continue
+        # One broken tenant (e.g. no Org_League row) must not stop the refresh for the rest
+        try:
+            refreshed += refresh_tenant_snapshots(tenant, domain, force)
+        except Exception:
+            logger.exception('Snapshot refresh failed for %s', tenant.schema_name)
+    return refreshed
+
+
+# Regenerate one organization's stale public page snapshots
+def refresh_tenant_snapshots(tenant, domain, force=False):
+    refreshed = 0
+    # Rendered for the primary domain, so stored under the organization schema visitors to that domain resolve to
+    org_schema = get_host_org_schema(domain.domain)
+    with tenant_context(tenant):
+        version = get_league_version(tenant.schema_name)
+        for name in SNAPSHOT_PAGES:
+            snapshot = cache.get(get_snapshot_key(org_schema, reverse(name)))
+            if not force and snapshot is not None and is_snapshot_fresh(snapshot, version):
+                continue
+            response = render_snapshot(tenant, domain, name)
+            if store_snapshot(org_schema, reverse(name), version, response) is not None:
+                refreshed += 1
+    return refreshed
+
+
+# Organization details appear on the public pages, so drop that tenant's snapshots when they change
+@receiver(post_save, sender=Org_League)
+@receiver(post_delete, sender=Org_League)
+def org_snapshots_changed(sender, instance, **kwargs):
+    cache.delete_many([get_snapshot_key(instance.org_schema, reverse(name)) for name in SNAPSHOT_PAGES])
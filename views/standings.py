@@ -0,0 +1,46 @@
+from collections import defaultdict
+#Django modules
+from django.db.models import F
+#Project models
+from esports.models import League_Team
+
+# Columns the standings tables display for each team
+STANDINGS_FIELDS = (
+    'id',
+    'league_game_id',
+    'conference',
+    'school_team__school__school_name',
+    'school_team__school__school_image',
+    'wins',
+    'losses',
+    'ties',
+    'points',
+)
+
+# Build league -> conference -> ordered team rows for each group of leagues using a single query
+def build_standings(*league_groups):
+    league_ids = [league.id for leagues in league_groups for league in leagues]
+
+    # Fetch every team for every league at once, sorted in the database by points, wins and score differential
+    teams = League_Team.objects.filter(league_game_id__in=league_ids)
+    teams = teams.exclude(school_team=None)
+    teams = teams.filter(bye_week_name="None")
+    teams = teams.annotate(score_diff=F('score_for') - F('score_against'))
+    teams = teams.order_by('league_game_id', 'conference', '-points', '-wins', '-score_diff')
+
+    # Group rows by league then conference, keeping the database ordering
+    league_confs = defaultdict(dict)
+    for team in teams.values(*STANDINGS_FIELDS):
+        league_confs[team['league_game_id']].setdefault(team['conference'], []).append(team)
+
+    standings = []
+    for leagues in league_groups:
+        standings.append([
+            {
+                'league':league,
+                'conferences':[{'name':conf, 'teams':conf_teams} for conf, conf_teams in league_confs[league.id].items()],
+            }
+            for league in leagues
+        ])
+    return standings
+
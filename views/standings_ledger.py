@@ -0,0 +1,72 @@
+from collections import defaultdict
+#Django modules
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+#Project models
+from esports.models import League_Team, Match
+from esports.views.league_cache import invalidate_league_cache
+from esports.views.league_view import TEAM_RECORD_FIELDS, calculate_points
+
+# Completed Match rows are the result history: submit_scores increments League_Team
+# counters in the same transaction that marks a match complete, and this module
+# recomputes those counters from the matches to find and repair drift.
+
+
+# Totals for each side of a completed match, keyed by the field names on League_Team
+def get_side_totals(team, other):
+    no_forfeit = Q(**{team + '_forfeit':False, other + '_forfeit':False})
+    return {
+        'wins':Count('pk', filter=Q(**{team + '_forfeit':False, other + '_forfeit':True}) | (no_forfeit & Q(**{team + '_score__gt':F(other + '_score')}))),
+        'losses':Count('pk', filter=Q(**{team + '_forfeit':True}) | (no_forfeit & Q(**{team + '_score__lt':F(other + '_score')}))),
+        'ties':Count('pk', filter=no_forfeit & Q(**{team + '_score':F(other + '_score')})),
+        'forfeits':Count('pk', filter=Q(**{team + '_forfeit':True})),
+        'score_for':Coalesce(Sum(team + '_score'), 0),
+        'score_against':Coalesce(Sum(other + '_score'), 0),
+    }
+
+
+# Recompute every team's record for a league game from its completed matches
+def get_recorded_standings(league_game):
+    completed = Match.objects.filter(match_date__league_game=league_game, complete=True)
+    completed = completed.exclude(home_team=None).exclude(away_team=None)
+
+    # One grouped aggregate per side of the match, summed per team
+    totals = defaultdict(lambda: dict.fromkeys(TEAM_RECORD_FIELDS, 0))
+    for team, other in (('home', 'away'), ('away', 'home')):
+        side_totals = completed.values(team + '_team').annotate(**get_side_totals(team, other)).order_by()
+        for row in side_totals:
+            team_totals = totals[row[team + '_team']]
+            for field in TEAM_RECORD_FIELDS:
+                team_totals[field] += row[field]
+
+    for team_totals in totals.values():
+        team_totals['points'] = calculate_points(team_totals['wins'], team_totals['losses'], team_totals['ties'], team_totals['forfeits'])
+    return totals
+
+
+# Compare stored team records against match history, optionally writing the recomputed totals back
+def rebuild_standings(league_game, fix=False):
+    fields = TEAM_RECORD_FIELDS + ['points']
+
+    with transaction.atomic():
+        teams = League_Team.objects.filter(league_game=league_game).select_related('school_team__school').order_by('pk')
+        if fix:
+            # Lock the teams before reading match history so a submission can't commit between the read and the write
+            teams = list(teams.select_for_update(of=('self',)))
+        totals = get_recorded_standings(league_game)
+
+        mismatches = []
+        for team in teams:
+            expected = totals.get(team.pk, dict.fromkeys(fields, 0))
+            changes = {field:(getattr(team, field), expected[field]) for field in fields if getattr(team, field) != expected[field]}
+            if changes:
+                for field, (stored, recorded) in changes.items():
+                    setattr(team, field, recorded)
+                mismatches.append({'team':team, 'changes':changes})
+
+        if fix and mismatches:
+            League_Team.objects.bulk_update([mismatch['team'] for mismatch in mismatches], fields)
+            schema = connection.get_schema()
+            transaction.on_commit(lambda: invalidate_league_cache(schema))
+    return mismatches
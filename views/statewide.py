@@ -0,0 +1,136 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+#Django modules
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, Count, Q
+from django.http import HttpResponseForbidden, JsonResponse
+from django_tenants.utils import get_public_schema_name, get_tenant_model, schema_context
+#Project models
+from esports.models import League_Team, Match
+from esports.views.league_cache import get_league_version
+from esports.views.roles import is_state_office
+
+# Worker threads used to query tenant schemas at the same time
+MAX_WORKERS = 8
+
+STATEWIDE_KEY = 'statewide:summary'
+
+logger = logging.getLogger('esports.statewide')
+
+
+# Aggregate one organization's active season inside its own schema
+def get_schema_summary(schema):
+    # Read the data version first so a change during the queries marks the summary stale
+    version = get_league_version(schema)
+    with schema_context(schema):
+        matches = Match.objects.filter(match_date__league_game__activate=True, complete=True)
+        totals = matches.aggregate(
+            matches_played=Count('pk'),
+            home_forfeits=Count('pk', filter=Q(home_forfeit=True)),
+            away_forfeits=Count('pk', filter=Q(away_forfeit=True)),
+            home_sportsmanship=Avg('away_homesportsmanship'),
+            away_sportsmanship=Avg('home_awaysportsmanship'),
+            home_ontime=Count('pk', filter=Q(away_homeontime=True)),
+            away_ontime=Count('pk', filter=Q(home_awayontime=True)),
+        )
+
+        # First place team in each active league game
+        leaders = League_Team.objects.filter(league_game__activate=True).exclude(school_team=None)
+        leaders = leaders.order_by('league_game_id', '-points', '-wins').distinct('league_game_id')
+        leaders = leaders.values('league_game__league_season_name', 'school_team__school__school_name', 'wins', 'losses', 'ties', 'points')
+
+        return {
+            'schema':schema,
+            'version':version,
+            'totals':totals,
+            'leaders':[
+                {
+                    'schema':schema,
+                    'league':leader['league_game__league_season_name'],
+                    'school':leader['school_team__school__school_name'],
+                    'wins':leader['wins'],
+                    'losses':leader['losses'],
+                    'ties':leader['ties'],
+                    'points':leader['points'],
+                }
+                for leader in leaders
+            ],
+        }
+
+
+# Worker entry point, each thread has its own database connection to close when done
+def run_schema_summary(schema):
+    try:
+        return get_schema_summary(schema)
+    finally:
+        connection.close()
+
+
+# Combine per-organization summaries into statewide numbers
+def merge_summaries(schema_summaries):
+    matches_played = forfeits = ontime = 0
+    sportsmanship_total = 0.0
+    sportsmanship_count = 0
+    leaders = []
+    for summary in schema_summaries.values():
+        totals = summary['totals']
+        matches_played += totals['matches_played']
+        forfeits += totals['home_forfeits'] + totals['away_forfeits']
+        ontime += totals['home_ontime'] + totals['away_ontime']
+        for side in ('home_sportsmanship', 'away_sportsmanship'):
+            if totals[side] is not None:
+                sportsmanship_total += totals[side] * totals['matches_played']
+                sportsmanship_count += totals['matches_played']
+        leaders.extend(summary['leaders'])
+
+    team_results = matches_played * 2
+    return {
+        'organizations':len(schema_summaries),
+        'matches_played':matches_played,
+        'forfeit_rate':forfeits / team_results if team_results else 0,
+        'ontime_rate':ontime / team_results if team_results else 0,
+        'average_sportsmanship':sportsmanship_total / sportsmanship_count if sportsmanship_count else None,
+        'leaders':sorted(leaders, key=lambda leader: (-leader['points'], -leader['wins'])),
+    }
+
+
+# Refresh the cached statewide summary, re-querying only schemas whose league data changed
+def refresh_statewide_summary(force=False, max_workers=MAX_WORKERS):
+    public_schema = get_public_schema_name()
+    schemas = list(get_tenant_model().objects.exclude(schema_name=public_schema).values_list('schema_name', flat=True))
+
+    previous = cache.get(STATEWIDE_KEY) or {'schemas':{}}
+    schema_summaries = {schema:summary for schema, summary in previous['schemas'].items() if schema in schemas}
+    stale = [schema for schema in schemas if force or schema not in schema_summaries or schema_summaries[schema]['version'] != get_league_version(schema)]
+
+    # Fan the per-schema queries out over a bounded pool, one broken schema keeps its last summary
+    if stale:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {schema:executor.submit(run_schema_summary, schema) for schema in stale}
+        for schema, future in futures.items():
+            try:
+                schema_summaries[schema] = future.result()
+            except Exception:
+                logger.exception('Statewide summary failed for %s', schema)
+
+    statewide = {
+        'schemas':schema_summaries,
+        'summary':merge_summaries(schema_summaries),
+        'refreshed':stale,
+    }
+    cache.set(STATEWIDE_KEY, statewide, None)
+    return statewide
+
+
+# Latest statewide summary for the league office, built only by the refresh_statewide_stats command
+def statewide_summary(request):
+    if not is_state_office(request):
+        return HttpResponseForbidden()
+    statewide = cache.get(STATEWIDE_KEY)
+    if statewide is None:
+        # Never fan out across every schema inside a request
+        response = JsonResponse({'error':'The statewide summary has not been built yet.'}, status=503)
+        response['Retry-After'] = '300'
+        return response
+    return JsonResponse(statewide['summary'])
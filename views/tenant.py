@@ -0,0 +1,51 @@
+import time
+#Django modules
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+#Project models
+from esports.models import Org_League
+
+# Seconds a worker trusts its in-memory copy before rechecking the shared cache
+LOCAL_ORG_TTL = 60
+
+# Per-process copies of Org_League rows keyed by schema: {schema: (org, expires)}
+_local_orgs = {}
+
+
+# Organization schema for a host name's subdomain
+def get_host_org_schema(host):
+    subdomain = host.split('.')[0]
+    if subdomain == 'public' or subdomain == '127': # For testing
+        subdomain = 'gse' # Default schema
+    return subdomain
+
+
+# Organization schema for the request's subdomain
+def get_org_schema(request):
+    return get_host_org_schema(request.META.get('HTTP_HOST'))
+
+
+# Organization data for the request, served from process memory or the shared cache when possible
+def get_org(request):
+    schema = get_org_schema(request)
+    now = time.monotonic()
+
+    local_org = _local_orgs.get(schema)
+    if local_org is not None and local_org[1] > now:
+        return local_org[0]
+
+    org = cache.get('org:' + schema)
+    if org is None:
+        org = Org_League.objects.get(org_schema=schema)
+        cache.set('org:' + schema, org, None)
+    _local_orgs[schema] = (org, now + LOCAL_ORG_TTL)
+    return org
+
+
+# Drop cached copies when an organization is edited
+@receiver(post_save, sender=Org_League)
+@receiver(post_delete, sender=Org_League)
+def org_changed(sender, instance, **kwargs):
+    _local_orgs.pop(instance.org_schema, None)
+    cache.delete('org:' + instance.org_schema)
@@ -0,0 +1,120 @@
+import io
+import logging
+#Django modules
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django_tenants.utils import get_public_schema_name, get_tenant_model, tenant_context
+from PIL import Image
+#Project models
+from esports.models import School
+
+logger = logging.getLogger('esports.thumbnails')
+
+# Logo sizes used by the templates, twice the CSS box so they stay sharp on phones
+LOGO_SIZES = {
+    'standings':(120, 100),
+    'bracket':(50, 40),
+}
+
+# Formats generated for every size, WebP first with PNG as the fallback
+THUMBNAIL_FORMATS = {
+    'webp':{'format':'WEBP', 'quality':80, 'method':6},
+    'png':{'format':'PNG', 'optimize':True},
+}
+
+
+# Storage path of a logo thumbnail, keeping the original extension so logo.png and logo.jpg don't collide
+def get_thumbnail_name(image_name, size, extension):
+    width, height = LOGO_SIZES[size]
+    return 'thumbnails/' + str(width) + 'x' + str(height) + '/' + image_name + '.' + extension
+
+
+# Cache key holding a thumbnail's URL, only set once the thumbnail is in storage
+def get_thumbnail_key(thumbnail_name):
+    return 'thumbnail:' + thumbnail_name
+
+
+# Create every format of one thumbnail size from the original logo
+def generate_thumbnails(image_name, size):
+    with default_storage.open(image_name) as image_file:
+        image = Image.open(image_file)
+        image.load()
+    image.thumbnail(LOGO_SIZES[size], Image.LANCZOS)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    for extension, options in THUMBNAIL_FORMATS.items():
+        thumbnail_name = get_thumbnail_name(image_name, size, extension)
+        output = io.BytesIO()
+        image.save(output, **options)
+        if default_storage.exists(thumbnail_name):
+            default_storage.delete(thumbnail_name)
+        default_storage.save(thumbnail_name, ContentFile(output.getvalue()))
+        cache.set(get_thumbnail_key(thumbnail_name), default_storage.url(thumbnail_name), None)
+
+
+# Make sure every size and format of a logo exists and its URLs are cached, returns True if any were generated
+def ensure_thumbnails(image_name, force=False):
+    generated = False
+    for size in LOGO_SIZES:
+        names = [get_thumbnail_name(image_name, size, extension) for extension in THUMBNAIL_FORMATS]
+        if force or not all(default_storage.exists(name) for name in names):
+            generate_thumbnails(image_name, size)
+            generated = True
+        else:
+            cache.set_many({get_thumbnail_key(name):default_storage.url(name) for name in names}, None)
+    return generated
+
+
+# Generate missing logo thumbnails for every organization's schools, returns the number of logos generated
+def refresh_thumbnails(force=False):
+    tenants = get_tenant_model().objects.exclude(schema_name=get_public_schema_name())
+    generated = 0
+    for tenant in tenants:
+        with tenant_context(tenant):
+            image_names = School.objects.exclude(school_image='').values_list('school_image', flat=True)
+            for image_name in image_names:
+                try:
+                    generated += ensure_thumbnails(image_name, force)
+                except (OSError, ValueError):
+                    logger.warning('Could not create thumbnails for %s in %s', image_name, tenant.schema_name)
+    return generated
+
+
+# URLs of a logo's thumbnails ({'webp': url, 'png': url}), read from the cache only so rendering never touches
+# storage; None until the upload hook or generate_thumbnails command has created them, so the original is shown
+def get_thumbnail_urls(image, size):
+    image_name = str(image or '')
+    if not image_name:
+        return None
+
+    names = {extension:get_thumbnail_name(image_name, size, extension) for extension in THUMBNAIL_FORMATS}
+    urls = cache.get_many([get_thumbnail_key(name) for name in names.values()])
+    if len(urls) < len(names):
+        return None
+    return {extension:urls[get_thumbnail_key(name)] for extension, name in names.items()}
+
+
+# Remember the stored image name so post_save can tell whether the logo changed
+@receiver(pre_save, sender=School)
+def school_image_saving(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._previous_school_image = ''
+    else:
+        instance._previous_school_image = School.objects.filter(pk=instance.pk).values_list('school_image', flat=True).first() or ''
+
+
+# Regenerate every logo size when a school's image is uploaded or changed
+@receiver(post_save, sender=School)
+def school_image_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'school_image' not in update_fields:
+        return
+    if instance.school_image and instance.school_image.name != getattr(instance, '_previous_school_image', ''):
+        try:
+            ensure_thumbnails(instance.school_image.name, force=True)
+        except (OSError, ValueError):
+            # The page keeps showing the original until the generate_thumbnails command succeeds
+            logger.warning('Could not create thumbnails for %s', instance.school_image.name)
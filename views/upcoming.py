@@ -0,0 +1,41 @@
+from collections import defaultdict
+
+# Columns the upcoming matches tables display for each match
+UPCOMING_FIELDS = (
+    'match_date__league_game_id',
+    'match_date__match_date',
+    'home_team__conference',
+    'home_team__school_team__school__school_name',
+    'away_team__school_team__school__school_name',
+)
+
+# Build league -> date -> conference -> match rows for each group of leagues using a single query
+def build_upcoming(matches, *league_groups):
+    league_ids = [league.id for leagues in league_groups for league in leagues]
+
+    # Fetch only the columns shown, sorted in the database into display order
+    matches = matches.filter(match_date__league_game_id__in=league_ids)
+    matches = matches.order_by('match_date__league_game_id', 'match_date__match_date', 'home_team__conference', 'pk')
+
+    # Group rows by league, date then conference, keeping the database ordering
+    league_dates = defaultdict(dict)
+    for match in matches.values(*UPCOMING_FIELDS):
+        dates = league_dates[match['match_date__league_game_id']]
+        dates.setdefault(match['match_date__match_date'], {}).setdefault(match['home_team__conference'], []).append(match)
+
+    upcoming = []
+    for leagues in league_groups:
+        upcoming.append([
+            {
+                'league':league,
+                'dates':[
+                    {
+                        'date':date,
+                        'conferences':[{'name':conf, 'matches':conf_matches} for conf, conf_matches in date_confs.items()],
+                    }
+                    for date, date_confs in league_dates[league.id].items()
+                ],
+            }
+            for league in leagues
+        ])
+    return upcoming